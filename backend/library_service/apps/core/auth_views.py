@@ -31,7 +31,7 @@ class SignupView(APIView):
             user = User.objects.filter(username=member.email).first()
             if not user:
                 # Fallback if signal didn't fire
-                user = User.objects.create(
+                user = User(
                     username=member.email,
                     email=member.email,
                     first_name=member.first_name,
@@ -45,11 +45,11 @@ class SignupView(APIView):
                 assign_default_member_role(user)
             
             # Create API token for the user
-            token = APIToken.objects.create(user=user)
+            token = APIToken.issue(user)
             
             return Response(
                 {
-                    'token': token.key,
+                    'token': token.raw_key,
                     'member': MemberDetailSerializer(member).data,
                     'message': 'Account created successfully'
                 },
@@ -82,7 +82,7 @@ class LoginView(APIView):
             user = User.objects.filter(username=member.email).first()
             if not user:
                 # Create user if doesn't exist (shouldn't happen with signals)
-                user = User.objects.create(
+                user = User(
                     username=member.email,
                     email=member.email,
                     first_name=member.first_name,
@@ -94,12 +94,14 @@ class LoginView(APIView):
                 from .utils import assign_default_member_role
                 assign_default_member_role(user)
             
-            # Get or create API token for this user
-            token, created = APIToken.objects.get_or_create(user=user)
+            # Issue a new token; stored tokens are hashed, so an existing
+            # one can't be handed out again. The user's oldest tokens past
+            # APIToken.MAX_TOKENS_PER_USER are revoked.
+            token = APIToken.issue(user)
             
             return Response(
                 {
-                    'token': token.key,
+                    'token': token.raw_key,
                     'member': MemberDetailSerializer(member).data,
                     'message': 'Login successful'
                 },
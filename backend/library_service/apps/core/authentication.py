@@ -3,6 +3,7 @@ Custom authentication backends for the library service.
 """
 from rest_framework.authentication import TokenAuthentication, get_authorization_header
 from rest_framework.exceptions import AuthenticationFailed
+from django.core.cache import cache
 from django.utils import timezone
 
 
@@ -22,15 +23,21 @@ class APITokenAuthentication(TokenAuthentication):
         from .models import APIToken
 
         try:
-            token = APIToken.objects.select_related('user').get(key=key)
+            token = APIToken.objects.select_related('user').get(key=APIToken.hash_key(key))
         except APIToken.DoesNotExist:
             raise AuthenticationFailed('Invalid token.')
 
         if not token.user.is_active:
             raise AuthenticationFailed('User account is disabled.')
 
-        # Update last_used_at timestamp
-        token.last_used_at = timezone.now()
-        token.save(update_fields=['last_used_at'])
+        # Seed the permission classes' group cache; with a shared cache the
+        # auth_user_groups join is skipped on repeat requests
+        token.user._group_names = APIToken.get_cached_roles(token.key, token.user)
+
+        # Update last_used_at at most once per interval; cache.add only
+        # succeeds for the first request after the marker expires
+        if cache.add(APIToken.last_used_cache_key(token.key), 1, APIToken.LAST_USED_INTERVAL):
+            token.last_used_at = timezone.now()
+            APIToken.objects.filter(pk=token.pk).update(last_used_at=token.last_used_at)
 
         return (token.user, token)
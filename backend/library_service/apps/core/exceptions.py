@@ -36,3 +36,27 @@ def custom_exception_handler(exc, context):
         )
     
     return response
+
+
+class BorrowingError(Exception):
+    """
+    Base class for errors raised by borrowing operations.
+    """
+
+
+class BookNotAvailableException(BorrowingError):
+    """
+    Raised when a book has no copies left to lend.
+    """
+
+
+class BookAlreadyReturnedException(BorrowingError):
+    """
+    Raised when returning a borrowing that has already been returned.
+    """
+
+
+class BookAlreadyBorrowedException(BorrowingError):
+    """
+    Raised when a member already has an active borrowing of the same book.
+    """
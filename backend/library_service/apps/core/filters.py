@@ -74,7 +74,7 @@ class BorrowingFilterSet(django_filters.FilterSet):
     
     def filter_active(self, queryset, name, value):
         if value:
-            return queryset.filter(returned_at__isnull=True)
+            return queryset.active()
         return queryset.filter(returned_at__isnull=False)
     
     class Meta:
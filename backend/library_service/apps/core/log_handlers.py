@@ -0,0 +1,47 @@
+"""
+Logging handlers for the core library service application.
+"""
+import atexit
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+class QueuedRotatingFileHandler(QueueHandler):
+    """
+    Rotating file handler whose writes happen on a background thread.
+
+    Logging calls only enqueue the record; a QueueListener drains the queue
+    into a RotatingFileHandler, so requests never wait on disk I/O. Takes
+    the same arguments as RotatingFileHandler, and the formatter configured
+    for this handler is applied by the file handler when the record is
+    written.
+    """
+
+    def __init__(self, filename, mode='a', maxBytes=0, backupCount=0,
+                 encoding=None, delay=False):
+        super().__init__(queue.SimpleQueue())
+        self.target = RotatingFileHandler(
+            filename, mode=mode, maxBytes=maxBytes, backupCount=backupCount,
+            encoding=encoding, delay=delay,
+        )
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+        self._listening = True
+        # Flush what's still queued when the process exits
+        atexit.register(self._stop_listener)
+
+    def setFormatter(self, fmt):
+        # prepare() still merges the args and any traceback into the message
+        # in the calling thread; the configured formatter is then applied
+        # by the file handler in the listener thread
+        self.target.setFormatter(fmt)
+
+    def _stop_listener(self):
+        if self._listening:
+            self._listening = False
+            self.listener.stop()
+
+    def close(self):
+        self._stop_listener()
+        self.target.close()
+        super().close()
@@ -0,0 +1,14 @@
+"""
+Management command to fine all overdue active borrowings.
+"""
+from django.core.management.base import BaseCommand
+
+from library_service.apps.core.services import BorrowingService
+
+
+class Command(BaseCommand):
+    help = 'Create or update fines for active borrowings past their due date'
+
+    def handle(self, *args, **options):
+        assessed = BorrowingService.assess_overdue_fines()
+        self.stdout.write(self.style.SUCCESS(f'Assessed {assessed} overdue fines'))
@@ -2,10 +2,12 @@
 Django management command to bootstrap roles (groups) and create a super admin user.
 """
 from django.core.management.base import BaseCommand
-from django.contrib.auth.models import User, Group
+from django.contrib.auth.models import User
 from django.db import transaction
 from django.conf import settings
 
+from library_service.apps.core.utils import ensure_roles_exist
+
 
 class Command(BaseCommand):
     help = 'Create default RBAC groups and a super admin user'
@@ -22,8 +24,8 @@ class Command(BaseCommand):
         password = options['password']
 
         # Create groups
-        for name in ('ADMIN', 'LIBRARIAN', 'MEMBER'):
-            Group.objects.get_or_create(name=name)
+        role_ids = ensure_roles_exist()
+        for name in role_ids:
             self.stdout.write(self.style.SUCCESS(f'Ensured group: {name}'))
 
         # Create superuser if not exists
@@ -36,8 +38,7 @@ class Command(BaseCommand):
         # Ensure superuser is in ADMIN group
         admin_user = User.objects.filter(username=username).first()
         if admin_user:
-            admin_group = Group.objects.get(name='ADMIN')
-            admin_user.groups.add(admin_group)
+            admin_user.groups.add(role_ids['ADMIN'])
             admin_user.save()
             self.stdout.write(self.style.SUCCESS(f'Added {username} to ADMIN group'))
 
@@ -49,31 +50,17 @@ class Command(BaseCommand):
     def _sync_members_to_users(self):
         """Create Django Users for existing Members that don't have one."""
         from library_service.apps.core.models import Member
-        from library_service.apps.core.utils import assign_default_member_role
+        from library_service.apps.core.utils import sync_users_for_members
 
-        members_without_users = []
-        for member in Member.objects.all():
-            if member.email and not User.objects.filter(username=member.email).exists():
-                members_without_users.append(member)
+        members = Member.objects.only('email', 'first_name', 'last_name', 'membership_status')
+        try:
+            created = sync_users_for_members(members)
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Failed to sync Members to Users: {e}'))
+            return
 
-        if not members_without_users:
+        if not created:
             self.stdout.write(self.style.SUCCESS('All members already have Django User accounts'))
             return
 
-        for member in members_without_users:
-            try:
-                user = User.objects.create(
-                    username=member.email,
-                    email=member.email,
-                    first_name=member.first_name or '',
-                    last_name=member.last_name or '',
-                    is_active=(member.membership_status == 'active')
-                )
-                user.set_unusable_password()
-                user.save()
-                assign_default_member_role(user)
-                self.stdout.write(self.style.SUCCESS(f'Created User for member: {member.email}'))
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f'Failed to create User for {member.email}: {e}'))
-
-        self.stdout.write(self.style.SUCCESS(f'Synced {len(members_without_users)} members to Users'))
+        self.stdout.write(self.style.SUCCESS(f'Synced {created} members to Users'))
@@ -208,39 +208,40 @@ class Command(BaseCommand):
     
     def _create_members(self, count=30):
         """Create sample member accounts."""
+        from library_service.apps.core.signals import disable_member_user_sync
+        from library_service.apps.core.utils import sync_users_for_members
+
         members = []
-        member_group, _ = Group.objects.get_or_create(name='MEMBER')
+        new_members = []
         
-        for i in range(count):
-            email = f'member{i+1}@library.local'
-            
-            existing = Member.objects.filter(email=email).first()
-            if existing:
-                members.append(existing)
-                continue
+        # Save rows without the per-member User signal, then sync Users
+        # (and the MEMBER group) for the whole batch at once
+        with disable_member_user_sync():
+            for i in range(count):
+                email = f'member{i+1}@library.local'
                 
-            member = Member.objects.create(
-                email=email,
-                first_name=self.fake.first_name(),
-                last_name=self.fake.last_name(),
-                phone=self.fake.phone_number(),
-                address=self.fake.address(),
-                membership_number=f'MEM-{i+1:05d}',
-                membership_status=random.choice(['active', 'active', 'active', 'suspended'])  # Mostly active
-            )
-            # Set password for new members
-            member.set_password('password123')
-            member.save()
-            
-            # Add to MEMBER group via User object (signal creates User)
-            # Note: The signal already assigns MEMBER group, but we do it explicitly
-            user = User.objects.filter(username=email).first()
-            if user:
-                user.groups.add(member_group)
-                user.save()
-            
-            members.append(member)
+                existing = Member.objects.filter(email=email).first()
+                if existing:
+                    members.append(existing)
+                    continue
+                    
+                member = Member(
+                    email=email,
+                    first_name=self.fake.first_name(),
+                    last_name=self.fake.last_name(),
+                    phone=self.fake.phone_number(),
+                    address=self.fake.address(),
+                    membership_number=f'MEM-{i+1:05d}',
+                    membership_status=random.choice(['active', 'active', 'active', 'suspended'])  # Mostly active
+                )
+                # Set password for new members
+                member.set_password('password123')
+                member.save()
+                
+                new_members.append(member)
+                members.append(member)
         
+        sync_users_for_members(new_members)
         return members
     
     def _create_books(self, count=60):
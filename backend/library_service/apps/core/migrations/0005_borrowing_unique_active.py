@@ -0,0 +1,57 @@
+# Generated by Django 4.2.8 on 2026-10-15 22:40
+
+from django.db import migrations, models
+from django.db.models.functions import Least
+
+DUPLICATE_NOTE = "Closed by migration 0005: duplicate of an earlier active borrowing."
+
+
+def close_duplicate_active_borrowings(apps, schema_editor):
+    """Keep the oldest active borrowing per member and book, close the rest.
+
+    Only the serializer enforced one active borrowing per member and book
+    before this constraint, so older databases can hold duplicates. Each
+    extra one is marked returned at its own borrowed_at, noted as such,
+    and its copy is released.
+    """
+    Book = apps.get_model("core", "Book")
+    Borrowing = apps.get_model("core", "Borrowing")
+    active = Borrowing.objects.filter(returned_at__isnull=True)
+    duplicated = (
+        active.order_by()
+        .values("member_id", "book_id")
+        .annotate(active_count=models.Count("id"))
+        .filter(active_count__gt=1)
+    )
+    for pair in duplicated:
+        borrowings = active.filter(
+            member_id=pair["member_id"], book_id=pair["book_id"]
+        ).order_by("borrowed_at", "id")
+        extras = list(borrowings[1:])
+        for borrowing in extras:
+            borrowing.returned_at = borrowing.borrowed_at
+            borrowing.notes = "\n".join(filter(None, [borrowing.notes, DUPLICATE_NOTE]))
+            borrowing.save(update_fields=["returned_at", "notes", "updated_at"])
+        Book.objects.filter(id=pair["book_id"]).update(
+            available_copies=Least(
+                models.F("available_copies") + len(extras), models.F("total_copies")
+            )
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0004_apitoken"),
+    ]
+
+    operations = [
+        migrations.RunPython(close_duplicate_active_borrowings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="borrowing",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("returned_at__isnull", True)),
+                fields=("member", "book"),
+                name="unique_active_borrowing_per_member_book",
+            ),
+        ),
+    ]
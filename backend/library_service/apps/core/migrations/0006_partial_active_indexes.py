@@ -0,0 +1,36 @@
+# Generated by Django 4.2.8 on 2026-10-15 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0005_borrowing_unique_active"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                condition=models.Q(("returned_at__isnull", True)),
+                fields=["due_date"],
+                name="brw_due_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                condition=models.Q(("returned_at__isnull", True)),
+                fields=["-borrowed_at"],
+                name="brw_borrowed_active_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="fine",
+            index=models.Index(
+                condition=models.Q(("is_paid", False)),
+                fields=["-created_at"],
+                name="fine_unpaid_idx",
+            ),
+        ),
+    ]
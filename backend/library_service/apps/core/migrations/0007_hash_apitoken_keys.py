@@ -0,0 +1,35 @@
+# Generated by hand: store API tokens as BLAKE2b digests
+import hashlib
+
+from django.db import migrations, models
+
+RAW_KEY_LENGTH = 40
+
+
+def hash_existing_keys(apps, schema_editor):
+    """Replace raw token keys with their BLAKE2b digest; clients keep working."""
+    APIToken = apps.get_model("core", "APIToken")
+    raw_keys = APIToken.objects.values_list("key", flat=True)
+    for raw_key in [key for key in raw_keys if len(key) == RAW_KEY_LENGTH]:
+        digest = hashlib.blake2b(raw_key.encode(), digest_size=32).hexdigest()
+        APIToken.objects.filter(key=raw_key).update(key=digest)
+
+
+def delete_hashed_keys(apps, schema_editor):
+    """Digests can't be turned back into tokens, so drop them on reverse."""
+    apps.get_model("core", "APIToken").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0006_partial_active_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="apitoken",
+            name="key",
+            field=models.CharField(max_length=64, primary_key=True, serialize=False),
+        ),
+        migrations.RunPython(hash_existing_keys, delete_hashed_keys),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.8 on 2026-10-15 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0007_hash_apitoken_keys"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["member", "-borrowed_at"], name="core_borrow_member__0da690_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="borrowing",
+            index=models.Index(
+                fields=["book", "-borrowed_at"], name="core_borrow_book_id_295ada_idx"
+            ),
+        ),
+    ]
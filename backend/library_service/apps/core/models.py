@@ -1,12 +1,16 @@
 """
 Models for the core library service application.
 """
+from django.conf import settings
+from django.core.cache import cache
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 from django.contrib.auth.hashers import make_password, check_password, identify_hasher
 from django.contrib.auth.models import User
 from datetime import timedelta
+import hashlib
+import time
 import uuid
 
 
@@ -57,6 +61,43 @@ class Member(TimestampedModel):
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
     
+    # Seconds a member's active/overdue listing page stays cached. Writes
+    # bump a version instead of deleting pages, so every page and page
+    # size of the listing goes stale at once.
+    BORROWINGS_CACHE_TIMEOUT = 30
+    _ALL_BORROWINGS_VERSION_KEY = 'mbrv:all'
+    
+    @staticmethod
+    def borrowings_version_key(member_id):
+        """Return the cache key holding the listing version for a member."""
+        return f'mbrv:{member_id}'
+    
+    @classmethod
+    def borrowings_cache_key(cls, member_id, url):
+        """Return the cache key for one listing page of a member's borrowings."""
+        version_key = cls.borrowings_version_key(member_id)
+        versions = cache.get_many([version_key, cls._ALL_BORROWINGS_VERSION_KEY])
+        digest = hashlib.md5(url.encode()).hexdigest()
+        return (
+            f'mbr:{member_id}:{versions.get(version_key, 0)}:'
+            f'{versions.get(cls._ALL_BORROWINGS_VERSION_KEY, 0)}:{digest}'
+        )
+    
+    @classmethod
+    def invalidate_borrowings_cache(cls, member_ids=None):
+        """Expire cached listings of `member_ids`, or of every member if None."""
+        if not settings.SHARED_CACHE:
+            # Listings are only cached in a shared cache
+            return
+        version = time.time_ns()
+        if member_ids is None:
+            cache.set(cls._ALL_BORROWINGS_VERSION_KEY, version, None)
+        else:
+            cache.set_many(
+                {cls.borrowings_version_key(member_id): version for member_id in member_ids},
+                None
+            )
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -100,13 +141,11 @@ class Member(TimestampedModel):
     
     def get_active_borrowings(self):
         """Get all currently active borrowings for this member."""
-        return self.borrowing_set.filter(returned_at__isnull=True)
+        return self.borrowing_set.active()
     
     def get_overdue_borrowings(self):
         """Get all overdue borrowings for this member."""
-        return self.get_active_borrowings().filter(
-            due_date__lt=timezone.now().date()
-        )
+        return self.borrowing_set.overdue()
 
 
 class Book(TimestampedModel):
@@ -162,7 +201,22 @@ class Book(TimestampedModel):
     
     def get_active_borrowings_count(self):
         """Get the number of active borrowings for this book."""
-        return self.borrowing_set.filter(returned_at__isnull=True).count()
+        return self.borrowing_set.active().count()
+
+
+class BorrowingQuerySet(models.QuerySet):
+    """
+    Filters for borrowing states, usable from `Borrowing.objects` and
+    related managers such as `member.borrowing_set`.
+    """
+    
+    def active(self):
+        """Borrowings that have not been returned yet."""
+        return self.filter(returned_at__isnull=True)
+    
+    def overdue(self):
+        """Active borrowings past their due date."""
+        return self.active().filter(due_date__lt=timezone.now().date())
 
 
 class Borrowing(TimestampedModel):
@@ -174,6 +228,7 @@ class Borrowing(TimestampedModel):
         ('overdue', 'Overdue'),
         ('returned', 'Returned'),
     ]
+    LOAN_PERIOD = timedelta(days=14)
     
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     member = models.ForeignKey(Member, on_delete=models.CASCADE)
@@ -183,12 +238,37 @@ class Borrowing(TimestampedModel):
     returned_at = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True, null=True)
     
+    objects = BorrowingQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-borrowed_at']
         indexes = [
             models.Index(fields=['member', 'returned_at']),
             models.Index(fields=['book', 'returned_at']),
+            # Member and book histories read newest first straight off these
+            models.Index(fields=['member', '-borrowed_at']),
+            models.Index(fields=['book', '-borrowed_at']),
             models.Index(fields=['due_date']),
+            # Partial indexes over the small active subset for the
+            # active and overdue listings
+            models.Index(
+                fields=['due_date'],
+                name='brw_due_active_idx',
+                condition=models.Q(returned_at__isnull=True),
+            ),
+            models.Index(
+                fields=['-borrowed_at'],
+                name='brw_borrowed_active_idx',
+                condition=models.Q(returned_at__isnull=True),
+            ),
+        ]
+        constraints = [
+            # A member can hold at most one active borrowing of a book
+            models.UniqueConstraint(
+                fields=['member', 'book'],
+                condition=models.Q(returned_at__isnull=True),
+                name='unique_active_borrowing_per_member_book',
+            ),
         ]
     
     def __str__(self):
@@ -198,7 +278,7 @@ class Borrowing(TimestampedModel):
         """Override save to set due_date if not provided."""
         if not self.due_date:
             # Default borrowing period is 14 days
-            self.due_date = timezone.now().date() + timedelta(days=14)
+            self.due_date = timezone.now().date() + self.LOAN_PERIOD
         super().save(*args, **kwargs)
     
     @property
@@ -245,6 +325,14 @@ class Fine(TimestampedModel):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Unpaid fines listing, newest first
+            models.Index(
+                fields=['-created_at'],
+                name='fine_unpaid_idx',
+                condition=models.Q(is_paid=False),
+            ),
+        ]
     
     def __str__(self):
         return f"Fine for {self.borrowing.member.full_name} - ${self.amount}"
@@ -254,11 +342,14 @@ class APIToken(models.Model):
     """
     Token model for API authentication.
     Links a token to a Django User (which in turn links to a Member).
+
+    Only a BLAKE2b digest of the token is stored in `key`; the raw token is
+    available as `raw_key` on the instance that created it, once.
     """
     from django.contrib.auth.models import User as DjangoUser
     import secrets
     
-    key = models.CharField(max_length=40, primary_key=True)
+    key = models.CharField(max_length=64, primary_key=True)
     user = models.ForeignKey(
         'auth.User',
         on_delete=models.CASCADE,
@@ -274,14 +365,72 @@ class APIToken(models.Model):
     def __str__(self):
         return f'Token for {self.user.username}'
 
+    # Seconds a token's resolved roles stay cached when the cache is shared
+    # across workers; group changes invalidate them immediately (see signals.py)
+    ROLES_CACHE_TIMEOUT = 300
+
+    @staticmethod
+    def roles_cache_key(key):
+        """Return the cache key holding the role names for token `key`."""
+        return f'tokroles:{key}'
+
+    # Seconds between last_used_at writes for one token
+    LAST_USED_INTERVAL = 60
+
+    @staticmethod
+    def last_used_cache_key(key):
+        """Return the cache key marking a recent last_used_at write for `key`."""
+        return f'tokused:{key}'
+
+    @classmethod
+    def get_cached_roles(cls, key, user):
+        """
+        Return the group names of `user`, cached under token `key`.
+
+        Read from the database on every call unless settings.SHARED_CACHE
+        is set, so a revoked role can't outlive its invalidation in another
+        worker's local cache.
+        """
+        def load_roles():
+            return frozenset(user.groups.values_list('name', flat=True))
+
+        if not settings.SHARED_CACHE:
+            return load_roles()
+        return cache.get_or_set(
+            cls.roles_cache_key(key), load_roles, cls.ROLES_CACHE_TIMEOUT
+        )
+
+    # Tokens kept per user; each login issues one and drops the oldest
+    # beyond this, so repeated logins don't grow the table
+    MAX_TOKENS_PER_USER = 5
+
+    @classmethod
+    def issue(cls, user):
+        """Create a token for `user` and prune their oldest surplus tokens."""
+        token = cls.objects.create(user=user)
+        stale = list(
+            cls.objects.filter(user=user)
+            .order_by('-created_at')
+            .values_list('pk', flat=True)[cls.MAX_TOKENS_PER_USER:]
+        )
+        if stale:
+            cls.objects.filter(pk__in=stale).delete()
+        return token
+
     @classmethod
     def generate_key(cls):
         """Generate a secure random token key."""
         import secrets
         return secrets.token_hex(20)
 
+    @staticmethod
+    def hash_key(raw_key):
+        """Return the stored form of a raw token."""
+        return hashlib.blake2b(raw_key.encode(), digest_size=32).hexdigest()
+
     def save(self, *args, **kwargs):
-        """Generate token key if not set."""
+        """Generate a token if not set, keeping only its digest."""
         if not self.key:
-            self.key = self.generate_key()
+            self.raw_key = self.generate_key()
+            self.key = self.hash_key(self.raw_key)
         return super().save(*args, **kwargs)
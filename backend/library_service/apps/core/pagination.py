@@ -1,14 +1,90 @@
 """
 Pagination classes for the core library service application.
 """
-from rest_framework.pagination import PageNumberPagination
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the planner's row estimate for unfiltered
+    PostgreSQL tables instead of running COUNT(*) over the whole table.
+
+    Only used at or above `estimate_threshold` rows, where an exact total
+    matters less than not scanning the table; smaller tables, filtered
+    querysets and other backends are counted exactly.
+    """
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        estimate = self.estimated_count()
+        if estimate is not None and estimate >= self.estimate_threshold:
+            return estimate
+        return super().count
+
+    def estimated_count(self):
+        """Return pg_class.reltuples for an unfiltered queryset, else None."""
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return None
+        query = queryset.query
+        if query.where or query.distinct or query.combinator or query.is_sliced:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table is first vacuumed or analyzed
+        if row is None or row[0] < 0:
+            return None
+        return row[0]
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     """
     Standard pagination class for API responses.
     """
+    django_paginator_class = EstimatedCountPaginator
     page_size = 20
     page_size_query_param = 'page_size'
     page_size_query_description = 'Number of results to return per page.'
     max_page_size = 100
+
+
+class BorrowingCursorPagination(CursorPagination):
+    """
+    Keyset pagination for borrowing listings, chosen by passing `?cursor=`.
+
+    Each page seeks past the previous page's last sort key instead of
+    skipping rows with OFFSET, so deep pages cost the same as the first.
+    """
+    ordering = '-borrowed_at'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        # The listing's own order, not the viewset's ordering filter
+        return (self.ordering,)
+
+
+class OverdueCursorPagination(BorrowingCursorPagination):
+    """
+    Keyset pagination for overdue borrowings, oldest loan first.
+
+    Cursors seek on a single column, which must be nearly unique: within a
+    run of equal values DRF falls back to an offset, and rows inserted
+    concurrently can then be skipped or repeated. due_date is shared by
+    every borrowing from the same day, so pages seek on borrowed_at, which
+    tracks it for standard loans.
+    """
+    ordering = 'borrowed_at'
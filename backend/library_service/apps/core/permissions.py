@@ -7,45 +7,78 @@ from django.contrib.auth.models import Group, User
 from rest_framework.permissions import BasePermission
 
 
-def _user_in_group(user: Optional[User], group_name: str) -> bool:
-    """Return True if the given user is a member of group_name.
+def _group_names(user: User) -> frozenset:
+    """Return the names of the user's groups, loaded once per user object.
+
+    Uses prefetched `groups` when present; otherwise one query, whose result
+    is kept on the user so later checks in the same request are free.
+    """
+    names = getattr(user, '_group_names', None)
+    if names is None:
+        names = frozenset(group.name for group in user.groups.all())
+        user._group_names = names
+    return names
+
+
+# One bit per role so a permission check is a single AND on an int
+ROLE_ADMIN = 1
+ROLE_LIBRARIAN = 2
+ROLE_MEMBER = 4
+_ROLE_BITS = {'ADMIN': ROLE_ADMIN, 'LIBRARIAN': ROLE_LIBRARIAN, 'MEMBER': ROLE_MEMBER}
+
+
+def _role_mask(user: User) -> int:
+    """Return the user's roles as a bitmask, computed once per user object."""
+    mask = getattr(user, '_role_mask', None)
+    if mask is None:
+        mask = 0
+        for name in _group_names(user):
+            mask |= _ROLE_BITS.get(name, 0)
+        user._role_mask = mask
+    return mask
+
+
+def _has_role(user: Optional[User], roles: int) -> bool:
+    """Return True if the given user holds any of the `roles` bits.
 
     Works safely if `user` is None or not a Django `User` instance.
     """
     if not user or not getattr(user, 'is_authenticated', False):
         return False
     try:
-        return user.groups.filter(name=group_name).exists()
+        return bool(_role_mask(user) & roles)
     except Exception:
         return False
 
 
+def is_admin_or_librarian(user: Optional[User]) -> bool:
+    """Return True for library staff (ADMIN or LIBRARIAN), who see all records."""
+    return _has_role(user, ROLE_ADMIN | ROLE_LIBRARIAN)
+
+
 class IsAdmin(BasePermission):
     """Allow access only to users in the ADMIN group."""
 
     def has_permission(self, request, view):
-        return _user_in_group(request.user, 'ADMIN')
+        return _has_role(request.user, ROLE_ADMIN)
 
 
 class IsLibrarian(BasePermission):
     """Allow access only to users in the LIBRARIAN group."""
 
     def has_permission(self, request, view):
-        return _user_in_group(request.user, 'LIBRARIAN')
+        return _has_role(request.user, ROLE_LIBRARIAN)
 
 
 class IsAdminOrLibrarian(BasePermission):
     """Allow access to users in ADMIN or LIBRARIAN groups."""
 
     def has_permission(self, request, view):
-        return (
-            _user_in_group(request.user, 'ADMIN')
-            or _user_in_group(request.user, 'LIBRARIAN')
-        )
+        return _has_role(request.user, ROLE_ADMIN | ROLE_LIBRARIAN)
 
 
 class IsMember(BasePermission):
     """Allow access only to users in the MEMBER group."""
 
     def has_permission(self, request, view):
-        return _user_in_group(request.user, 'MEMBER')
+        return _has_role(request.user, ROLE_MEMBER)
@@ -0,0 +1,27 @@
+"""
+Response renderers for the core library service application.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson.
+
+    orjson writes bytes directly and is several times faster than the
+    stdlib encoder on large list responses. Types orjson doesn't know
+    (Decimal, lazy strings, querysets) fall back to DRF's encoder.
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+    _fallback = JSONEncoder().default
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        options = self.options
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=self._fallback, option=options)
@@ -29,12 +29,18 @@ class MemberSerializer(serializers.ModelSerializer):
         }
     
     def get_active_borrowings_count(self, obj):
-        """Get count of active borrowings."""
-        return obj.get_active_borrowings().count()
+        """Get count of active borrowings, preferring the queryset annotation."""
+        count = getattr(obj, 'active_borrowings_total', None)
+        if count is None:
+            return obj.get_active_borrowings().count()
+        return count
     
     def get_overdue_borrowings_count(self, obj):
-        """Get count of overdue borrowings."""
-        return obj.get_overdue_borrowings().count()
+        """Get count of overdue borrowings, preferring the queryset annotation."""
+        count = getattr(obj, 'overdue_borrowings_total', None)
+        if count is None:
+            return obj.get_overdue_borrowings().count()
+        return count
     
     def validate_email(self, value):
         """Validate email is unique."""
@@ -72,12 +78,18 @@ class BookSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
     
     def get_borrowing_count(self, obj):
-        """Get total borrowing count for this book."""
-        return obj.get_borrowing_count()
+        """Get total borrowing count, preferring the queryset annotation."""
+        count = getattr(obj, 'borrowing_total', None)
+        if count is None:
+            return obj.get_borrowing_count()
+        return count
     
     def get_active_borrowings_count(self, obj):
-        """Get active borrowings count for this book."""
-        return obj.get_active_borrowings_count()
+        """Get active borrowings count, preferring the queryset annotation."""
+        count = getattr(obj, 'active_borrowings_total', None)
+        if count is None:
+            return obj.get_active_borrowings_count()
+        return count
     
     def validate_total_copies(self, value):
         """Ensure total copies is at least 1."""
@@ -132,6 +144,70 @@ class BorrowingListSerializer(serializers.ModelSerializer):
         ]
 
 
+# Columns `borrowing_list_rows` reads; select them with
+# `queryset.values(*BORROWING_LIST_VALUES)`
+BORROWING_LIST_VALUES = (
+    'id', 'member_id', 'member__first_name', 'member__last_name',
+    'book_id', 'book__title', 'borrowed_at', 'due_date', 'returned_at',
+    'fine__id', 'fine__amount', 'fine__reason', 'fine__is_paid', 'fine__paid_at',
+)
+
+
+def borrowing_list_rows(rows):
+    """
+    Render `values(*BORROWING_LIST_VALUES)` rows as BorrowingListSerializer would.
+
+    List endpoints skip model instances and the per-row serializer walk;
+    dates and amounts are still formatted by the serializer's own fields,
+    so the output is identical.
+    """
+    fields = BorrowingListSerializer().fields
+    to_datetime = fields['borrowed_at'].to_representation
+    to_date = fields['due_date'].to_representation
+    to_amount = fields['fine'].fields['amount'].to_representation
+    today = timezone.now().date()
+
+    results = []
+    for row in rows:
+        due_date = row['due_date']
+        returned_at = row['returned_at']
+        is_overdue = returned_at is None and today > due_date
+        if returned_at is not None:
+            borrowing_status = 'returned'
+        elif is_overdue:
+            borrowing_status = 'overdue'
+        else:
+            borrowing_status = 'active'
+
+        fine = None
+        if row['fine__id'] is not None:
+            paid_at = row['fine__paid_at']
+            fine = {
+                'id': str(row['fine__id']),
+                'amount': to_amount(row['fine__amount']),
+                'reason': row['fine__reason'],
+                'is_paid': row['fine__is_paid'],
+                'paid_at': to_datetime(paid_at) if paid_at is not None else None,
+            }
+
+        results.append({
+            'id': str(row['id']),
+            'member': row['member_id'],
+            'member_name': f"{row['member__first_name']} {row['member__last_name']}",
+            'book': row['book_id'],
+            'book_title': row['book__title'],
+            'borrowed_at': to_datetime(row['borrowed_at']),
+            'due_date': to_date(due_date),
+            'returned_at': to_datetime(returned_at) if returned_at is not None else None,
+            'status': borrowing_status,
+            'is_overdue': is_overdue,
+            'days_until_due': None if returned_at is not None else (due_date - today).days,
+            'days_overdue': (today - due_date).days if is_overdue else 0,
+            'fine': fine,
+        })
+    return results
+
+
 class BorrowingDetailSerializer(serializers.ModelSerializer):
     """
     Detailed serializer for borrowing operations.
@@ -200,6 +276,38 @@ class BorrowingDetailSerializer(serializers.ModelSerializer):
         return data
 
 
+class BulkBorrowingSerializer(serializers.Serializer):
+    """
+    Serializer for borrowing several books for one member at once.
+    """
+    member_id = serializers.UUIDField()
+    book_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        min_length=1,
+        max_length=50
+    )
+    due_date = serializers.DateField(required=False)
+    
+    def validate_member_id(self, value):
+        """Validate member exists and is active."""
+        try:
+            member = Member.objects.get(id=value)
+        except Member.DoesNotExist:
+            raise serializers.ValidationError("Member not found.")
+        
+        if member.membership_status != 'active':
+            raise serializers.ValidationError("Member is not active.")
+        
+        return member
+
+
+class IncreaseCopiesSerializer(serializers.Serializer):
+    """
+    Serializer for adding copies to a book.
+    """
+    quantity = serializers.IntegerField(min_value=1, default=1)
+
+
 class FineSerializer(serializers.ModelSerializer):
     """
     Serializer for the Fine model.
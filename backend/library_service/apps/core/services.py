@@ -0,0 +1,402 @@
+"""
+Service layer for borrowing operations in the core library service application.
+"""
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from decimal import Decimal
+import logging
+
+from .models import Book, Borrowing, Fine, Member
+from .exceptions import (
+    BookAlreadyBorrowedException,
+    BookAlreadyReturnedException,
+    BookNotAvailableException,
+)
+
+logger = logging.getLogger(__name__)
+
+FINE_RATE_PER_DAY = Decimal('1.00')
+# Shared result for the common "not overdue" case
+_ZERO_FINE = Decimal('0.00')
+# Fines for up to a year overdue, precomputed so scans are a lookup
+_FINE_TABLE = tuple(map(FINE_RATE_PER_DAY.__mul__, range(366)))
+
+_ACTIVE_BORROWING_CONSTRAINT = 'unique_active_borrowing_per_member_book'
+
+# Availability changes are hot-path statements, so they are built once and
+# run through a raw cursor instead of being compiled by the ORM per call
+_DECREMENT_SQL = (
+    f"UPDATE {Book._meta.db_table} "
+    "SET available_copies = available_copies - 1 "
+    "WHERE id = %s AND available_copies > 0 "
+    "RETURNING available_copies"
+)
+_INCREMENT_SQL = (
+    f"UPDATE {Book._meta.db_table} "
+    "SET available_copies = available_copies + 1 "
+    "WHERE id = %s AND available_copies < total_copies "
+    "RETURNING available_copies"
+)
+
+# Fines for overdue borrowings computed and written in one statement.
+# Re-running it is safe: unpaid fines grow to the current charge, paid or
+# larger fines are left alone. `source` must expose the borrowing as `b`.
+# gen_random_uuid() is built in from PostgreSQL 13; older servers need the
+# pgcrypto extension.
+_OVERDUE_FINES_SQL = (
+    f"INSERT INTO {Fine._meta.db_table} "
+    "(id, borrowing_id, amount, reason, is_paid, created_at, updated_at) "
+    "SELECT gen_random_uuid(), b.id, (%(as_of)s - b.due_date) * %(rate)s, "
+    "'Overdue by ' || (%(as_of)s - b.due_date) || ' days', false, %(now)s, %(now)s "
+    "FROM {source} WHERE b.due_date < %(as_of)s{condition} "
+    "ON CONFLICT (borrowing_id) DO UPDATE "
+    "SET amount = EXCLUDED.amount, reason = EXCLUDED.reason, updated_at = EXCLUDED.updated_at "
+    f"WHERE NOT {Fine._meta.db_table}.is_paid "
+    f"AND {Fine._meta.db_table}.amount < EXCLUDED.amount"
+)
+_ASSESS_OVERDUE_FINES_SQL = _OVERDUE_FINES_SQL.format(
+    source=f"{Borrowing._meta.db_table} b",
+    condition=" AND b.returned_at IS NULL",
+)
+
+# Return: mark the borrowing returned, release its copy and fine a late
+# return in one round trip. The fine is the same upsert as the overdue
+# sweep, so a fine it already assessed is brought up to date.
+_RETURN_SQL = (
+    "WITH b AS ("
+    f"UPDATE {Borrowing._meta.db_table} "
+    "SET returned_at = %(now)s, updated_at = %(now)s "
+    "WHERE id = %(id)s AND returned_at IS NULL "
+    "RETURNING id, book_id, due_date"
+    "), k AS ("
+    f"UPDATE {Book._meta.db_table} "
+    "SET available_copies = available_copies + 1 "
+    f"FROM b WHERE {Book._meta.db_table}.id = b.book_id "
+    f"AND {Book._meta.db_table}.available_copies < {Book._meta.db_table}.total_copies"
+    "), f AS ("
+    + _OVERDUE_FINES_SQL.format(source="b", condition="")
+    + ") SELECT due_date FROM b"
+)
+
+
+def _update_available_copies(book_id, sql):
+    """
+    Run an availability UPDATE ... RETURNING for one book.
+
+    Returns the new available_copies, or None when the WHERE guard matched
+    no row. Reading the value back from the UPDATE saves a follow-up SELECT.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [Book._meta.pk.get_db_prep_value(book_id, connection)])
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def _constraint_name(error):
+    """
+    Return the name of the constraint an IntegrityError violated.
+
+    Read from the driver's diagnostics (psycopg2/psycopg 3) rather than the
+    message text; returns None on backends that do not expose it.
+    """
+    diag = getattr(error.__cause__, 'diag', None)
+    return getattr(diag, 'constraint_name', None)
+
+
+def list_available_books_nowait():
+    """
+    Lock and return books with copies available, skipping locked rows.
+
+    Books held by an in-flight borrow or return are left out rather than
+    waited on, so background workers scanning for copies never queue
+    behind the API. Evaluate the queryset inside `transaction.atomic()`.
+    """
+    return Book.objects.filter(
+        available_copies__gt=0
+    ).select_for_update(skip_locked=True, of=('self',))
+
+
+def calculate_fine_amount(days_overdue):
+    """Return the fine owed for `days_overdue` days; never negative."""
+    if days_overdue <= 0:
+        return _ZERO_FINE
+    if days_overdue < len(_FINE_TABLE):
+        return _FINE_TABLE[days_overdue]
+    return days_overdue * FINE_RATE_PER_DAY
+
+
+def _raise_unpaid_fines(fines, days_overdue, now):
+    """
+    Bring unpaid `fines` below the charge for `days_overdue` up to it.
+
+    The ORM counterpart of the ON CONFLICT ... DO UPDATE branch of
+    _OVERDUE_FINES_SQL, so every backend applies the same rule: paid or
+    larger fines are left alone. Returns the number of fines raised.
+    """
+    amount = calculate_fine_amount(days_overdue)
+    return fines.filter(is_paid=False, amount__lt=amount).update(
+        amount=amount,
+        reason=f"Overdue by {days_overdue} days",
+        updated_at=now,
+    )
+
+
+class BorrowingService:
+    """
+    Transactional borrow and return operations shared by the API views.
+
+    Lock order is always borrowing row first, then book rows by ascending
+    primary key. Member rows are never locked; inserts only take a key-share
+    lock on them, which does not conflict with FOR NO KEY UPDATE.
+    """
+
+    @classmethod
+    def create_borrowing(cls, member, book, **extra_fields):
+        """
+        Lend a copy of `book` to `member` and return the new borrowing.
+
+        The availability check and the decrement run as one conditional
+        UPDATE, so concurrent requests can never both take the last copy.
+        The returned count is written back onto `book` for the response.
+        """
+        with transaction.atomic():
+            available_copies = _update_available_copies(book.id, _DECREMENT_SQL)
+            if available_copies is None:
+                raise BookNotAvailableException("Book is not available.")
+
+            try:
+                borrowing = Borrowing.objects.create(
+                    member=member,
+                    book=book,
+                    **extra_fields
+                )
+            except IntegrityError as e:
+                if _constraint_name(e) == _ACTIVE_BORROWING_CONSTRAINT:
+                    raise BookAlreadyBorrowedException(
+                        "Member already has this book borrowed."
+                    ) from e
+                raise
+
+        book.available_copies = available_copies
+        transaction.on_commit(lambda: logger.info(
+            f"Book borrowed: {member.full_name} borrowed {book.title}"
+        ))
+        return borrowing
+
+    @classmethod
+    def create_borrowings_bulk(cls, member, book_ids, due_date=None):
+        """
+        Lend several books to `member` in one transaction.
+
+        The books are locked in primary key order, decremented with a single
+        UPDATE and the borrowings are written with one bulk INSERT. If any
+        book is unavailable or already borrowed by the member, nothing is
+        written.
+        """
+        book_ids = sorted(set(book_ids))
+        # bulk_create bypasses Borrowing.save(), so apply the default here
+        due_date = due_date or timezone.now().date() + Borrowing.LOAN_PERIOD
+
+        with transaction.atomic():
+            books = list(
+                Book.objects.select_for_update(of=('self',), no_key=True)
+                .filter(id__in=book_ids, available_copies__gt=0)
+                .only('id', 'title', 'available_copies')
+                .order_by('id')
+            )
+            if len(books) != len(book_ids):
+                raise BookNotAvailableException("One or more books are not available.")
+
+            if Borrowing.objects.filter(
+                member=member,
+                book_id__in=book_ids,
+                returned_at__isnull=True
+            ).exists():
+                raise BookAlreadyBorrowedException("Member already has this book borrowed.")
+
+            Book.objects.filter(id__in=book_ids).update(
+                available_copies=F('available_copies') - 1
+            )
+
+            borrowings = [
+                Borrowing(member=member, book=book, due_date=due_date)
+                for book in books
+            ]
+            try:
+                Borrowing.objects.bulk_create(borrowings, batch_size=500)
+            except IntegrityError as e:
+                if _constraint_name(e) == _ACTIVE_BORROWING_CONSTRAINT:
+                    raise BookAlreadyBorrowedException(
+                        "Member already has this book borrowed."
+                    ) from e
+                raise
+
+        for book in books:
+            book.available_copies -= 1
+        # bulk_create sends no post_save, so expire cached listings here
+        transaction.on_commit(lambda: Member.invalidate_borrowings_cache([member.pk]))
+        transaction.on_commit(lambda: logger.info(
+            f"Books borrowed: {member.full_name} borrowed {len(borrowings)} books"
+        ))
+        return borrowings
+
+    @classmethod
+    def _mark_returned(cls, borrowing_id, returned_at):
+        """
+        Set returned_at and release the book copy; return the due date.
+
+        On PostgreSQL this is one statement with a writable CTE that also
+        fines a late return. The borrowing UPDATE only matches an
+        unreturned row, so it takes the row lock and the "already
+        returned" check at once. Other backends lock the row with FOR NO
+        KEY UPDATE first, issue the two UPDATEs and leave the fine to the
+        caller.
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(_RETURN_SQL, {
+                    'id': Borrowing._meta.pk.get_db_prep_value(borrowing_id, connection),
+                    'now': returned_at,
+                    'as_of': returned_at.date(),
+                    'rate': FINE_RATE_PER_DAY,
+                })
+                row = cursor.fetchone()
+            if row:
+                return row[0]
+            # Nothing updated: tell a missing borrowing from a returned one
+            Borrowing.objects.only('id').get(id=borrowing_id)
+            raise BookAlreadyReturnedException(
+                "This book has already been returned."
+            )
+
+        borrowing = Borrowing.objects.select_for_update(
+            no_key=True
+        ).only(
+            'id', 'member_id', 'book_id', 'due_date', 'returned_at'
+        ).get(id=borrowing_id)
+
+        if borrowing.returned_at:
+            raise BookAlreadyReturnedException(
+                "This book has already been returned."
+            )
+
+        borrowing.returned_at = returned_at
+        borrowing.save(update_fields=['returned_at', 'updated_at'])
+        _update_available_copies(borrowing.book_id, _INCREMENT_SQL)
+        return borrowing.due_date
+
+    @classmethod
+    def return_borrowing(cls, borrowing_id):
+        """
+        Record the return of a borrowing and fine the member if it is late.
+
+        Only the borrowing row is locked, never with more than FOR NO KEY
+        UPDATE, so other transactions can keep inserting rows that
+        reference the same member or book. The book is released with a
+        conditional UPDATE that can never push available_copies above
+        total_copies.
+        """
+        returned_at = timezone.now()
+
+        with transaction.atomic():
+            due_date = cls._mark_returned(borrowing_id, returned_at)
+            days_overdue = max((returned_at.date() - due_date).days, 0)
+
+            # PostgreSQL already fined a late return in _mark_returned;
+            # elsewhere raise an existing unpaid fine, or create one
+            if days_overdue > 0 and connection.vendor != 'postgresql':
+                raised = _raise_unpaid_fines(
+                    Fine.objects.filter(borrowing_id=borrowing_id),
+                    days_overdue,
+                    returned_at,
+                )
+                if not raised:
+                    # A paid or larger fine conflicts and is kept as is
+                    Fine.objects.bulk_create(
+                        [Fine(
+                            borrowing_id=borrowing_id,
+                            amount=calculate_fine_amount(days_overdue),
+                            reason=f"Overdue by {days_overdue} days"
+                        )],
+                        ignore_conflicts=True
+                    )
+
+        # Reload the full row for the response once the locks are released
+        borrowing = Borrowing.objects.select_related(
+            'member', 'book', 'fine'
+        ).get(id=borrowing_id)
+
+        def log_return():
+            if days_overdue > 0:
+                logger.warning(
+                    f"Fine created: {borrowing.member.full_name} "
+                    f"returned {borrowing.book.title} {days_overdue} days late"
+                )
+            logger.info(
+                f"Book returned: {borrowing.member.full_name} returned {borrowing.book.title}"
+            )
+
+        # The PostgreSQL return is raw SQL and sends no post_save
+        transaction.on_commit(
+            lambda: Member.invalidate_borrowings_cache([borrowing.member_id])
+        )
+        transaction.on_commit(log_return)
+        return borrowing
+
+    @classmethod
+    def assess_overdue_fines(cls):
+        """
+        Fine every active borrowing that is past its due date.
+
+        On PostgreSQL this is a single INSERT ... SELECT ... ON CONFLICT,
+        so the sweep costs one round trip however many borrowings are late.
+        Other backends bulk insert the missing fines, then raise unpaid
+        fines with one UPDATE per due date. Either way paid or larger fines
+        are left alone. Returns the number of fines written.
+        """
+        now = timezone.now()
+        today = now.date()
+
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute(_ASSESS_OVERDUE_FINES_SQL, {
+                    'as_of': today,
+                    'rate': FINE_RATE_PER_DAY,
+                    'now': now,
+                })
+                assessed = cursor.rowcount
+        else:
+            overdue = Borrowing.objects.overdue()
+            fines = []
+            for borrowing_id, due_date in overdue.filter(
+                fine__isnull=True
+            ).values_list('id', 'due_date'):
+                days_overdue = (today - due_date).days
+                fines.append(Fine(
+                    borrowing_id=borrowing_id,
+                    amount=calculate_fine_amount(days_overdue),
+                    reason=f"Overdue by {days_overdue} days"
+                ))
+            Fine.objects.bulk_create(fines, batch_size=500, ignore_conflicts=True)
+            assessed = len(fines)
+
+            # Fines just inserted are already at the charge and don't match
+            due_dates = overdue.filter(fine__is_paid=False).order_by().values_list(
+                'due_date', flat=True
+            ).distinct()
+            for due_date in due_dates:
+                assessed += _raise_unpaid_fines(
+                    Fine.objects.filter(
+                        borrowing__returned_at__isnull=True,
+                        borrowing__due_date=due_date
+                    ),
+                    (today - due_date).days,
+                    now,
+                )
+
+        if assessed:
+            # Fines went to any number of members; expire every listing
+            transaction.on_commit(Member.invalidate_borrowings_cache)
+        logger.info(f"Overdue fines assessed: {assessed}")
+        return assessed
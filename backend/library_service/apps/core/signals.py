@@ -1,13 +1,26 @@
 """
 Signals to keep Django `User` rows in sync with `Member` model and assign default roles.
 """
-from django.db.models.signals import post_save
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.contrib.auth.models import User
+from django.contrib.auth.models import Group, User
 
-from .models import Member
+from . import utils
+from .models import APIToken, Borrowing, Fine, Member
 from .utils import assign_default_member_role
 
+logger = logging.getLogger(__name__)
+
+# Set by `disable_member_user_sync` for the current thread or task only
+_member_user_sync_disabled = ContextVar('member_user_sync_disabled', default=False)
+
 
 @receiver(post_save, sender=Member)
 def create_or_update_user_for_member(sender, instance: Member, created, **kwargs):
@@ -19,8 +32,9 @@ def create_or_update_user_for_member(sender, instance: Member, created, **kwargs
 
     This keeps RBAC groups attached to Django `User` objects while preserving
     the existing `Member` model as the primary domain model for library members.
+    Bulk imports should go through `utils.sync_users_for_members` instead.
     """
-    if not instance.email:
+    if not instance.email or _member_user_sync_disabled.get():
         return
 
     username = instance.email
@@ -28,7 +42,7 @@ def create_or_update_user_for_member(sender, instance: Member, created, **kwargs
         user = User.objects.filter(username=username).first()
         if not user:
             # Create a lightweight user so we can assign groups
-            user = User.objects.create(
+            user = User(
                 username=username,
                 first_name=instance.first_name or '',
                 last_name=instance.last_name or '',
@@ -36,6 +50,7 @@ def create_or_update_user_for_member(sender, instance: Member, created, **kwargs
                 is_active=(instance.membership_status == 'active')
             )
             # Do not try to reuse Member.password hash; set unusable password
+            # before the first save so the row is written once
             user.set_unusable_password()
             user.save()
             assign_default_member_role(user)
@@ -43,8 +58,105 @@ def create_or_update_user_for_member(sender, instance: Member, created, **kwargs
             # Keep active state in sync
             is_active = (instance.membership_status == 'active')
             if user.is_active != is_active:
-                user.is_active = is_active
-                user.save()
+                # Narrow UPDATE; skips the full-row save and User post_save
+                User.objects.filter(pk=user.pk).update(is_active=is_active)
     except Exception:
         # Be defensive in signals — avoid bubbling errors during save
-        pass
+        logger.exception("Failed to sync user for member %s", instance.pk)
+
+
+@contextmanager
+def disable_member_user_sync():
+    """Temporarily skip the `Member` -> `User` sync receiver.
+
+    Use around loops that save many members one by one, then call
+    `utils.sync_users_for_members` once for the whole batch. `bulk_create`
+    and `bulk_update` never send `post_save`, so they only need the sync call.
+    Only saves in the calling thread (or async task) are affected; the
+    receiver stays connected for everyone else.
+    """
+    token = _member_user_sync_disabled.set(True)
+    try:
+        yield
+    finally:
+        _member_user_sync_disabled.reset(token)
+
+
+def _invalidate_token_roles_for_users(user_ids):
+    """Drop cached token roles of `user_ids` once the transaction commits."""
+    keys = [
+        APIToken.roles_cache_key(key)
+        for key in APIToken.objects.filter(user_id__in=user_ids).values_list('key', flat=True)
+    ]
+    if keys:
+        # After commit, so a concurrent request can't re-cache the old roles
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_token_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached token roles for users whose groups changed.
+
+    Handles both `user.groups` and `group.user_set` edits. A reverse clear
+    has to collect the users before the rows are gone. Roles are only cached
+    with settings.SHARED_CACHE, so there is nothing to drop without it.
+    """
+    if not settings.SHARED_CACHE:
+        return
+    if reverse:
+        if action in ('post_add', 'post_remove'):
+            user_ids = pk_set
+        elif action == 'pre_clear':
+            user_ids = list(instance.user_set.values_list('pk', flat=True))
+        else:
+            return
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        user_ids = [instance.pk]
+    else:
+        return
+    _invalidate_token_roles_for_users(user_ids)
+
+
+@receiver(pre_delete, sender=Group)
+@receiver(post_save, sender=Group)
+def invalidate_group_token_roles(sender, instance, **kwargs):
+    """Drop cached token roles for members of a renamed or deleted group.
+
+    Neither a rename nor the cascade behind a delete sends `m2m_changed`.
+    Members are collected before a delete removes their rows.
+    """
+    if not settings.SHARED_CACHE or kwargs.get('created'):
+        return
+    _invalidate_token_roles_for_users(list(instance.user_set.values_list('pk', flat=True)))
+
+
+@receiver(post_delete, sender=Group)
+def forget_role_ids(sender, instance, **kwargs):
+    """Drop remembered role group ids once any group is deleted."""
+    utils._ROLE_IDS.clear()
+
+
+@receiver(post_save, sender=Borrowing)
+@receiver(post_delete, sender=Borrowing)
+def invalidate_member_borrowings(sender, instance, **kwargs):
+    """Expire the member's cached borrowing listings after a borrowing write.
+
+    Raw SQL and bulk writes in `BorrowingService` skip this signal and
+    invalidate explicitly.
+    """
+    member_id = instance.member_id
+    transaction.on_commit(lambda: Member.invalidate_borrowings_cache([member_id]))
+
+
+@receiver(post_save, sender=Fine)
+@receiver(post_delete, sender=Fine)
+def invalidate_fined_member_borrowings(sender, instance, **kwargs):
+    """Expire the fined member's cached borrowing listings, which show fines."""
+    if Fine.borrowing.is_cached(instance):
+        member_id = instance.borrowing.member_id
+    else:
+        member_id = Borrowing.objects.filter(
+            pk=instance.borrowing_id
+        ).values_list('member_id', flat=True).first()
+    if member_id is not None:
+        transaction.on_commit(lambda: Member.invalidate_borrowings_cache([member_id]))
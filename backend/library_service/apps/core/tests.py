@@ -1,21 +1,101 @@
 """
 Tests for the core library service application.
 """
-from django.test import TestCase
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+    skipUnlessDBFeature,
+)
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APITestCase
 from rest_framework import status
+from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor, wait
+from copy import copy
 from datetime import timedelta
+from decimal import Decimal
+import logging
+import os
+import tempfile
 from django.utils import timezone
+from threading import Barrier
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
 
-from .models import Member, Book, Borrowing, Fine
+from .log_handlers import QueuedRotatingFileHandler
+from .models import APIToken, Member, Book, Borrowing, Fine
+from .pagination import EstimatedCountPaginator
+from .exceptions import (
+    BookAlreadyBorrowedException,
+    BookAlreadyReturnedException,
+    BookNotAvailableException,
+)
+from .serializers import (
+    BORROWING_LIST_VALUES,
+    BorrowingListSerializer,
+    borrowing_list_rows,
+)
+from .services import (
+    BorrowingService,
+    calculate_fine_amount,
+    list_available_books_nowait,
+)
+from .signals import _member_user_sync_disabled, disable_member_user_sync
+from .utils import get_or_create_group, sync_users_for_members
 
+# Fine amounts used across the tests
+ZERO = Decimal('0.00')
+ONE = Decimal('1.00')
+THREE = Decimal('3.00')
+FIVE = Decimal('5.00')
+TEN = Decimal('10.00')
 
+# Statements per service call, savepoints included. Borrowing is an
+# UPDATE plus an INSERT; PostgreSQL returns a book and fines it in one CTE
+# while other backends lock, save, increment, then raise or insert the fine
+# separately. Both reload the result.
+CREATE_BORROWING_QUERIES = 4
+RETURN_BORROWING_QUERIES = 4 if connection.vendor == 'postgresql' else 6
+LATE_RETURN_BORROWING_QUERIES = 4 if connection.vendor == 'postgresql' else 8
+# Bulk borrow API: member lookup, savepoint, lock, active check, update,
+# insert, release, then one query for the response rows
+BULK_BORROWING_QUERIES = 8
+# Member list: role lookup, count and page. On PostgreSQL the paginator
+# reads the table's row estimate before deciding to count exactly.
+MEMBER_LIST_QUERIES = 4 if connection.vendor == 'postgresql' else 3
+
+
+def book_state(book):
+    """Return (available_copies, active borrowings) for a book in one query."""
+    return Book.objects.annotate(
+        active=Count('borrowing', filter=Q(borrowing__returned_at__isnull=True))
+    ).values_list('available_copies', 'active').get(pk=book.pk)
+
+
+def stored_copies(book):
+    """Return the stored available_copies for a book without a full reload."""
+    return Book.objects.values_list('available_copies', flat=True).get(pk=book.pk)
+
+
+# Member.save() and create_user() hash passwords; tests don't need PBKDF2
+fast_password_hashing = override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher']
+)
+
+
+@fast_password_hashing
 class MemberModelTests(TestCase):
     """Test cases for the Member model."""
     
-    def setUp(self):
-        self.member = Member.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.create(
             first_name='John',
             last_name='Doe',
             email='john@example.com',
@@ -30,13 +110,98 @@ class MemberModelTests(TestCase):
     def test_member_str(self):
         """Test member string representation."""
         self.assertEqual(str(self.member), 'John Doe')
+    
+    def test_member_save_creates_user(self):
+        """Test saving a member creates a matching MEMBER user."""
+        user = User.objects.get(username='john@example.com')
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(user.groups.filter(name='MEMBER').exists())
+    
+    def test_member_suspension_deactivates_user(self):
+        """Test changing membership status keeps the user's active flag in sync."""
+        self.member.membership_status = 'suspended'
+        self.member.save()
+        self.assertFalse(User.objects.get(username='john@example.com').is_active)
+    
+    def test_sync_users_for_members(self):
+        """Test bulk syncing users for members created without signals."""
+        members = Member.objects.bulk_create([
+            Member(
+                first_name='Bulk',
+                last_name=str(i),
+                email=f'bulk{i}@example.com',
+                membership_number=f'MEM10{i}',
+                membership_status='active' if i else 'suspended'
+            )
+            for i in range(3)
+        ])
+        self.member.membership_status = 'suspended'
+        
+        self.assertEqual(sync_users_for_members(members + [self.member]), 3)
+        users = User.objects.filter(username__startswith='bulk')
+        self.assertEqual(
+            users.aggregate(
+                total=Count('id', distinct=True),
+                members=Count('id', distinct=True, filter=Q(groups__name='MEMBER'))
+            ),
+            {'total': 3, 'members': 3}
+        )
+        self.assertFalse(users.get(username='bulk0@example.com').is_active)
+        self.assertFalse(User.objects.get(username='john@example.com').is_active)
+        self.assertEqual(sync_users_for_members(members), 0)
+    
+    def test_sync_users_for_members_counts_only_created(self):
+        """Test users created concurrently are neither duplicated nor counted."""
+        members = Member.objects.bulk_create([
+            Member(
+                first_name='Race',
+                last_name=str(i),
+                email=f'race{i}@example.com',
+                membership_number=f'MEM12{i}'
+            )
+            for i in range(2)
+        ])
+        User.objects.create(username='race0@example.com')
+        filter_users = User.objects.filter
+        lookups = []
+        
+        def filter_before_race(*args, **kwargs):
+            # The existing-user lookup runs before race0 is created elsewhere
+            lookups.append(kwargs)
+            if len(lookups) == 1:
+                return User.objects.none()
+            return filter_users(*args, **kwargs)
+        
+        with mock.patch.object(User.objects, 'filter', side_effect=filter_before_race):
+            self.assertEqual(sync_users_for_members(members), 1)
+        self.assertTrue(
+            User.objects.get(username='race1@example.com').groups.filter(name='MEMBER').exists()
+        )
+    
+    def test_disable_member_user_sync(self):
+        """Test member saves skip the User signal inside the context manager."""
+        with disable_member_user_sync():
+            member = Member.objects.create(
+                first_name='Quiet',
+                last_name='Import',
+                email='quiet@example.com',
+                membership_number='MEM110'
+            )
+            # Saves in other threads keep syncing
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                self.assertFalse(executor.submit(_member_user_sync_disabled.get).result())
+        self.assertFalse(User.objects.filter(username='quiet@example.com').exists())
+        
+        sync_users_for_members([member])
+        self.assertTrue(User.objects.filter(username='quiet@example.com').exists())
 
 
 class BookModelTests(TestCase):
     """Test cases for the Book model."""
     
-    def setUp(self):
-        self.book = Book.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.book = Book.objects.create(
             title='Test Book',
             author='Test Author',
             total_copies=5,
@@ -56,25 +221,27 @@ class BookModelTests(TestCase):
         self.assertFalse(self.book.is_available)
 
 
+@fast_password_hashing
 class BorrowingModelTests(TestCase):
     """Test cases for the Borrowing model."""
     
-    def setUp(self):
-        self.member = Member.objects.create(
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.create(
             first_name='Jane',
             last_name='Doe',
             email='jane@example.com',
             membership_number='MEM002'
         )
-        self.book = Book.objects.create(
+        cls.book = Book.objects.create(
             title='Test Book',
             author='Test Author',
             total_copies=1,
             available_copies=1
         )
-        self.borrowing = Borrowing.objects.create(
-            member=self.member,
-            book=self.book
+        cls.borrowing = Borrowing.objects.create(
+            member=cls.member,
+            book=cls.book
         )
     
     def test_create_borrowing(self):
@@ -88,6 +255,45 @@ class BorrowingModelTests(TestCase):
         self.borrowing.save()
         self.assertTrue(self.borrowing.is_overdue)
     
+    def test_state_querysets(self):
+        """Test active and overdue filters agree with the instance state."""
+        self.assertEqual(list(self.member.get_active_borrowings()), [self.borrowing])
+        self.assertFalse(self.member.get_overdue_borrowings().exists())
+        
+        Borrowing.objects.filter(pk=self.borrowing.pk).update(
+            due_date=timezone.now().date() - timedelta(days=1)
+        )
+        self.assertEqual(list(Borrowing.objects.overdue()), [self.borrowing])
+        
+        Borrowing.objects.filter(pk=self.borrowing.pk).update(returned_at=timezone.now())
+        self.assertFalse(Borrowing.objects.active().exists())
+        self.assertFalse(self.member.get_overdue_borrowings().exists())
+    
+    def test_list_rows_match_serializer(self):
+        """Test values() rows render exactly like BorrowingListSerializer."""
+        overdue_book = Book.objects.create(title='Overdue Book', author='A', total_copies=1)
+        returned_book = Book.objects.create(title='Returned Book', author='A', total_copies=1)
+        Borrowing.objects.create(
+            member=self.member,
+            book=overdue_book,
+            due_date=timezone.now().date() - timedelta(days=3)
+        )
+        returned = Borrowing.objects.create(
+            member=self.member,
+            book=returned_book,
+            returned_at=timezone.now()
+        )
+        Fine.objects.create(
+            borrowing=returned, amount=Decimal('1.50'), reason='Late', is_paid=True,
+            paid_at=timezone.now()
+        )
+        
+        borrowings = Borrowing.objects.order_by('-borrowed_at')
+        self.assertEqual(
+            borrowing_list_rows(borrowings.values(*BORROWING_LIST_VALUES)),
+            BorrowingListSerializer(borrowings, many=True).data
+        )
+    
     def test_return_book(self):
         """Test returning a book."""
         self.borrowing.returned_at = timezone.now()
@@ -95,28 +301,311 @@ class BorrowingModelTests(TestCase):
         self.assertEqual(self.borrowing.status, 'returned')
 
 
-class MemberAPITests(APITestCase):
-    """Test cases for Member API endpoints."""
+@fast_password_hashing
+class BorrowingServiceTests(TestCase):
+    """Test cases for the BorrowingService."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        # bulk_create skips Member.save() and the User sync signal, neither
+        # of which the service needs
+        cls.member = Member(
+            first_name='Service',
+            last_name='Reader',
+            email='service@example.com',
+            membership_number='MEM010'
+        )
+        cls.book = Book(
+            title='Service Book',
+            author='Test Author',
+            total_copies=1,
+            available_copies=1
+        )
+        Member.objects.bulk_create([cls.member])
+        Book.objects.bulk_create([cls.book])
+    
+    def test_create_borrowing(self):
+        """Test borrowing takes one available copy."""
+        with self.assertNumQueries(CREATE_BORROWING_QUERIES):
+            borrowing = BorrowingService.create_borrowing(self.member, self.book)
+        self.assertEqual(borrowing.status, 'active')
+        self.assertEqual(self.book.available_copies, 0)
+        self.assertEqual(stored_copies(self.book), 0)
+    
+    def test_create_borrowing_no_available_copies(self):
+        """Test borrowing fails once no copies are left."""
+        Book.objects.filter(id=self.book.id).update(available_copies=0)
+        with self.assertRaises(BookNotAvailableException):
+            BorrowingService.create_borrowing(self.member, self.book)
+        self.assertFalse(Borrowing.objects.exists())
+    
+    @skipUnless(connection.vendor == 'postgresql', 'constraint names come from psycopg diagnostics')
+    def test_create_borrowing_twice(self):
+        """Test the active-borrowing constraint is reported as already borrowed."""
+        Book.objects.filter(id=self.book.id).update(total_copies=2, available_copies=2)
+        BorrowingService.create_borrowing(self.member, self.book)
+        with self.assertRaises(BookAlreadyBorrowedException):
+            BorrowingService.create_borrowing(self.member, self.book)
+        self.assertEqual(book_state(self.book), (1, 1))
+    
+    def test_create_borrowings_bulk(self):
+        """Test bulk borrowing takes one copy of each book."""
+        other_book = Book.objects.create(
+            title='Second Service Book',
+            author='Test Author',
+            total_copies=2,
+            available_copies=2
+        )
+        borrowings = BorrowingService.create_borrowings_bulk(
+            self.member,
+            [self.book.id, other_book.id]
+        )
+        self.assertEqual(len(borrowings), 2)
+        self.assertEqual(
+            Borrowing.objects.filter(member=self.member, returned_at__isnull=True).count(),
+            2
+        )
+        self.assertEqual(
+            dict(Book.objects.filter(id__in=[self.book.id, other_book.id]).values_list('id', 'available_copies')),
+            {self.book.id: 0, other_book.id: 1}
+        )
+    
+    def test_create_borrowings_bulk_is_all_or_nothing(self):
+        """Test bulk borrowing writes nothing if one book is unavailable."""
+        empty_book = Book.objects.create(
+            title='Empty Book',
+            author='Test Author',
+            total_copies=1,
+            available_copies=0
+        )
+        with self.assertRaises(BookNotAvailableException):
+            BorrowingService.create_borrowings_bulk(
+                self.member,
+                [self.book.id, empty_book.id]
+            )
+        self.assertFalse(Borrowing.objects.exists())
+        self.assertEqual(stored_copies(self.book), 1)
+    
+    def test_return_borrowing(self):
+        """Test returning releases the copy without a fine when on time."""
+        borrowing = BorrowingService.create_borrowing(self.member, self.book)
+        with self.assertNumQueries(RETURN_BORROWING_QUERIES):
+            returned = BorrowingService.return_borrowing(borrowing.id)
+        self.assertEqual(returned.status, 'returned')
+        self.assertEqual(returned.book.available_copies, 1)
+        self.assertEqual(stored_copies(self.book), 1)
+        self.assertFalse(Fine.objects.exists())
+    
+    def test_return_borrowing_with_fine(self):
+        """Test a late return creates a fine for each overdue day."""
+        borrowing = BorrowingService.create_borrowing(
+            self.member,
+            self.book,
+            due_date=timezone.now().date() - timedelta(days=3)
+        )
+        with self.assertNumQueries(LATE_RETURN_BORROWING_QUERIES):
+            BorrowingService.return_borrowing(borrowing.id)
+        fine = Fine.objects.get(borrowing=borrowing)
+        self.assertEqual(fine.amount, THREE)
+    
+    def test_return_borrowing_keeps_existing_fine(self):
+        """Test a late return does not replace a fine that already exists."""
+        borrowing = BorrowingService.create_borrowing(
+            self.member,
+            self.book,
+            due_date=timezone.now().date() - timedelta(days=3)
+        )
+        Fine.objects.create(borrowing=borrowing, amount=TEN, reason='Damaged')
+        returned = BorrowingService.return_borrowing(borrowing.id)
+        self.assertEqual(returned.fine.amount, TEN)
+        self.assertEqual(Fine.objects.filter(borrowing=borrowing).count(), 1)
+    
+    def test_return_borrowing_raises_unpaid_fine(self):
+        """Test a late return raises an unpaid fine but never a paid one."""
+        due_date = timezone.now().date() - timedelta(days=3)
+        for is_paid, amount in ((False, THREE), (True, ONE)):
+            borrowing = BorrowingService.create_borrowing(
+                self.member, self.book, due_date=due_date
+            )
+            fine = Fine.objects.create(
+                borrowing=borrowing, amount=ONE, reason='Overdue by 1 days', is_paid=is_paid
+            )
+            returned = BorrowingService.return_borrowing(borrowing.id)
+            self.assertEqual(returned.fine.pk, fine.pk)
+            self.assertEqual(returned.fine.amount, amount)
+    
+    def test_list_available_books_nowait(self):
+        """Test the skip-locked listing only returns books with copies left."""
+        Book.objects.create(title='Gone', author='Test Author', total_copies=1, available_copies=0)
+        with transaction.atomic():
+            books = list(list_available_books_nowait())
+        self.assertEqual(books, [self.book])
+    
+    def test_assess_overdue_fines(self):
+        """Test the overdue sweep fines late borrowings once per run."""
+        borrowing = BorrowingService.create_borrowing(
+            self.member,
+            self.book,
+            due_date=timezone.now().date() - timedelta(days=3)
+        )
+        self.assertEqual(BorrowingService.assess_overdue_fines(), 1)
+        BorrowingService.assess_overdue_fines()
+        fine = Fine.objects.get(borrowing=borrowing)
+        self.assertEqual(fine.amount, THREE)
+        self.assertEqual(fine.reason, 'Overdue by 3 days')
+    
+    def test_assess_overdue_fines_updates_unpaid_fine(self):
+        """Test the sweep raises an unpaid fine but never touches a paid one."""
+        borrowing = BorrowingService.create_borrowing(
+            self.member,
+            self.book,
+            due_date=timezone.now().date() - timedelta(days=3)
+        )
+        fine = Fine.objects.create(borrowing=borrowing, amount=ONE, reason='Overdue by 1 days')
+        self.assertEqual(BorrowingService.assess_overdue_fines(), 1)
+        self.assertEqual(Fine.objects.values_list('amount', flat=True).get(pk=fine.pk), THREE)
+        self.assertEqual(BorrowingService.assess_overdue_fines(), 0)
+        
+        Fine.objects.filter(id=fine.id).update(amount=ONE, is_paid=True)
+        self.assertEqual(BorrowingService.assess_overdue_fines(), 0)
+        self.assertEqual(Fine.objects.values_list('amount', flat=True).get(pk=fine.pk), ONE)
+    
+    def test_calculate_fine_amount(self):
+        """Test fines are charged per overdue day and never negative."""
+        self.assertEqual(calculate_fine_amount(-2), ZERO)
+        self.assertEqual(calculate_fine_amount(0), ZERO)
+        self.assertEqual(calculate_fine_amount(5), FIVE)
+        self.assertEqual(calculate_fine_amount(400), Decimal('400.00'))
+    
+    def test_return_borrowing_twice(self):
+        """Test a borrowing cannot be returned twice."""
+        borrowing = BorrowingService.create_borrowing(self.member, self.book)
+        BorrowingService.return_borrowing(borrowing.id)
+        with self.assertRaises(BookAlreadyReturnedException):
+            BorrowingService.return_borrowing(borrowing.id)
+        self.assertEqual(stored_copies(self.book), 1)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+@fast_password_hashing
+class BorrowingConcurrencyTests(TransactionTestCase):
+    """Test concurrent borrowing against a real transactional database."""
+    
+    # Threads need committed data, so this class can't use TestCase. Limit
+    # the flush after each test to the apps these models touch.
+    available_apps = [
+        'django.contrib.auth',
+        'django.contrib.contenttypes',
+        'library_service.apps.core',
+    ]
+    serialized_rollback = False
+    # The race resolves in milliseconds; anything slower is a lock wait
+    BORROW_TIMEOUT = 1
     
     def setUp(self):
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
+        self.member1 = Member.objects.create(
+            first_name='First',
+            last_name='Reader',
+            email='first@example.com',
+            membership_number='MEM011'
         )
-        self.client.force_authenticate(user=self.user)
+        self.member2 = Member.objects.create(
+            first_name='Second',
+            last_name='Reader',
+            email='second@example.com',
+            membership_number='MEM012'
+        )
+        self.book = Book.objects.create(
+            title='Last Copy',
+            author='Test Author',
+            total_copies=1,
+            available_copies=1
+        )
+    
+    def test_concurrent_borrowing_last_copy(self):
+        """Test only one of two simultaneous borrowers gets the last copy."""
+        barrier = Barrier(2)
+        
+        def borrow_book(member):
+            try:
+                # Connect before the barrier so both threads reach the
+                # conditional UPDATE together; each gets its own instance
+                # because the service writes the new count back onto it.
+                book = copy(self.book)
+                connection.ensure_connection()
+                barrier.wait()
+                BorrowingService.create_borrowing(member, book)
+                return 'ok'
+            except BookNotAvailableException:
+                return 'unavailable'
+            finally:
+                connection.close()
+        
+        executor = ThreadPoolExecutor(max_workers=2)
+        futures = [
+            executor.submit(borrow_book, member)
+            for member in (self.member1, self.member2)
+        ]
+        done, not_done = wait(futures, timeout=self.BORROW_TIMEOUT)
+        executor.shutdown(wait=False)
+        # A hung borrower means a lock wait, not a pass
+        self.assertFalse(not_done, 'borrower threads did not finish')
+        # result() re-raises anything other than BookNotAvailableException
+        results = [future.result() for future in done]
+        
+        self.assertEqual(sorted(results), ['ok', 'unavailable'])
+        self.assertEqual(book_state(self.book), (0, 1))
+
+
+@fast_password_hashing
+class MemberAPITests(APITestCase):
+    """Test cases for Member API endpoints."""
+    
+    @classmethod
+    def setUpTestData(cls):
+        # Requests use force_authenticate, so skip password hashing
+        cls.user = User.objects.create_user(username='testuser', password=None)
         
-        self.member = Member.objects.create(
+        cls.member = Member.objects.create(
             first_name='Test',
             last_name='User',
             email='test@example.com',
             membership_number='MEM003'
         )
     
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+    
     def test_list_members(self):
         """Test listing members."""
         response = self.client.get('/api/v1/members/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
     
+    def test_list_members_borrowing_counts(self):
+        """Test borrowing counts are served from the list query."""
+        self.user.groups.add(get_or_create_group('ADMIN'))
+        books = Book.objects.bulk_create([
+            Book(title=f'Book {number}', author='Author') for number in range(3)
+        ])
+        Borrowing.objects.create(member=self.member, book=books[0])
+        Borrowing.objects.create(
+            member=self.member,
+            book=books[1],
+            due_date=timezone.now().date() - timedelta(days=1)
+        )
+        Borrowing.objects.create(
+            member=self.member,
+            book=books[2],
+            returned_at=timezone.now()
+        )
+        
+        with self.assertNumQueries(MEMBER_LIST_QUERIES):
+            response = self.client.get('/api/v1/members/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['results'][0]
+        self.assertEqual(result['active_borrowings_count'], 2)
+        self.assertEqual(result['overdue_borrowings_count'], 1)
+    
     def test_create_member(self):
         """Test creating a member via API."""
         data = {
@@ -129,50 +618,336 @@ class MemberAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
 
+@fast_password_hashing
 class BookAPITests(APITestCase):
     """Test cases for Book API endpoints."""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
-        )
-        self.client.force_authenticate(user=self.user)
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password=None)
         
-        self.book = Book.objects.create(
+        cls.book = Book.objects.create(
             title='Test Book',
             author='Test Author'
         )
     
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+    
     def test_list_books(self):
         """Test listing books."""
         response = self.client.get('/api/v1/books/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json()['results'][0]['title'], 'Test Book')
+
+    @skipUnless(connection.vendor == 'postgresql', 'row estimates come from pg_class')
+    def test_unfiltered_count_uses_estimate(self):
+        """Test large unfiltered tables are counted from the planner estimate."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Book._meta.db_table}')
+        
+        paginator = EstimatedCountPaginator(Book.objects.all(), 20)
+        paginator.estimate_threshold = 1
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(paginator.count, 1)
+        self.assertNotIn('COUNT(', queries[0]['sql'])
+        
+        # Filtered querysets and small tables are counted exactly
+        paginator = EstimatedCountPaginator(Book.objects.filter(title='Missing'), 20)
+        paginator.estimate_threshold = 1
+        self.assertEqual(paginator.count, 0)
+        paginator = EstimatedCountPaginator(Book.objects.all(), 20)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(paginator.count, 1)
+        self.assertIn('COUNT(', queries[-1]['sql'])
+    
+    def test_available_count(self):
+        """Test available_count reports the stored counts from one query."""
+        Book.objects.filter(id=self.book.id).update(total_copies=3, available_copies=0)
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/v1/books/{self.book.id}/available_count/')
+        self.assertEqual(response.data, {
+            'book_id': str(self.book.id),
+            'title': 'Test Book',
+            'total_copies': 3,
+            'available_copies': 0,
+            'is_available': False,
+        })
+        
+        response = self.client.get('/api/v1/books/not-a-book/available_count/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_list_books_borrowing_counts(self):
+        """Test borrowing counts are served from the list query."""
+        member = Member.objects.create(
+            first_name='Count',
+            last_name='Reader',
+            email='count@example.com',
+            membership_number='MEM006'
+        )
+        Borrowing.objects.create(member=member, book=self.book)
+        Borrowing.objects.create(
+            member=member,
+            book=self.book,
+            returned_at=timezone.now()
+        )
+
+        response = self.client.get('/api/v1/books/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        result = response.data['results'][0]
+        self.assertEqual(result['borrowing_count'], 2)
+        self.assertEqual(result['active_borrowings_count'], 1)
 
+    def test_increase_copies(self):
+        """Test added copies are applied on top of the stored counts."""
+        self.user.groups.add(get_or_create_group('LIBRARIAN'))
+        Book.objects.filter(id=self.book.id).update(total_copies=2, available_copies=1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                f'/api/v1/books/{self.book.id}/increase_copies/',
+                {'quantity': 3}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Only serializing actions annotate the borrowing counts
+        self.assertFalse([q for q in queries if 'GROUP BY' in q['sql']])
+        self.assertEqual(response.data['total_copies'], 5)
+        self.assertEqual(response.data['available_copies'], 4)
+        self.assertEqual(stored_copies(self.book), 4)
+        
+        for quantity in (0, 'many'):
+            response = self.client.post(
+                f'/api/v1/books/{self.book.id}/increase_copies/',
+                {'quantity': quantity}
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('quantity', response.data['details'])
 
+
+@fast_password_hashing
 class BorrowingAPITests(APITestCase):
     """Test cases for Borrowing API endpoints."""
     
-    def setUp(self):
-        self.user = User.objects.create_user(
-            username='testuser',
-            password='testpass123'
-        )
-        self.client.force_authenticate(user=self.user)
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='testuser', password=None)
         
-        self.member = Member.objects.create(
+        cls.member = Member.objects.create(
             first_name='Test',
             last_name='User',
             email='test@example.com',
             membership_number='MEM005'
         )
-        self.book = Book.objects.create(
+        cls.book = Book.objects.create(
             title='Test Book',
             author='Test Author',
             available_copies=1
         )
     
+    def setUp(self):
+        self.client.force_authenticate(user=self.user)
+    
     def test_list_borrowings(self):
         """Test listing borrowings."""
         response = self.client.get('/api/v1/borrowings/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_bulk_borrow_response_query_count(self):
+        """Test the bulk response costs the same queries however many books."""
+        self.user.groups.add(get_or_create_group('ADMIN'))
+        books = Book.objects.bulk_create([
+            Book(title=f'Bulk Book {number}', author='Author', total_copies=2, available_copies=2)
+            for number in range(5)
+        ])
+        # The forced user keeps its roles after the first request
+        self.client.get('/api/v1/borrowings/')
+        
+        for batch in (books[:1], books):
+            Borrowing.objects.update(returned_at=timezone.now())
+            with self.assertNumQueries(BULK_BORROWING_QUERIES):
+                response = self.client.post('/api/v1/borrowings/bulk/', {
+                    'member_id': str(self.member.id),
+                    'book_ids': [str(book.id) for book in batch],
+                }, format='json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(
+                [row['book'] for row in response.data],
+                sorted(book.id for book in batch)
+            )
+            self.assertIsNone(response.data[0]['fine'])
+    
+    def test_active_pages_by_cursor_on_request(self):
+        """Test ?cursor= switches the active listing to keyset pages."""
+        self.user.groups.add(get_or_create_group('ADMIN'))
+        books = Book.objects.bulk_create([
+            Book(title=f'Cursor Book {number}', author='Author') for number in range(3)
+        ])
+        borrowings = [
+            Borrowing.objects.create(member=self.member, book=book) for book in books
+        ]
+        
+        response = self.client.get('/api/v1/borrowings/active/?page_size=2')
+        self.assertEqual(response.data['count'], 3)
+        
+        response = self.client.get('/api/v1/borrowings/active/?cursor=&page_size=2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertIn('cursor=', response.data['next'])
+        seen = [result['id'] for result in response.data['results']]
+        
+        response = self.client.get(response.data['next'])
+        seen += [result['id'] for result in response.data['results']]
+        self.assertIsNone(response.data['next'])
+        self.assertEqual(seen, [str(borrowing.id) for borrowing in reversed(borrowings)])
+    
+    def test_overdue_cursor_seeks_past_shared_due_dates(self):
+        """Test overdue cursors seek by position even when due dates tie."""
+        self.user.groups.add(get_or_create_group('ADMIN'))
+        books = Book.objects.bulk_create([
+            Book(title=f'Late Book {number}', author='Author') for number in range(3)
+        ])
+        due_date = timezone.now().date() - timedelta(days=2)
+        borrowings = [
+            Borrowing.objects.create(member=self.member, book=book, due_date=due_date)
+            for book in books
+        ]
+        
+        response = self.client.get('/api/v1/borrowings/overdue/?cursor=&page_size=2')
+        cursor = parse_qs(urlparse(response.data['next']).query)['cursor'][0]
+        position = parse_qs(b64decode(cursor).decode())
+        self.assertNotIn('o', position)
+        seen = [result['id'] for result in response.data['results']]
+        
+        response = self.client.get(response.data['next'])
+        seen += [result['id'] for result in response.data['results']]
+        self.assertEqual(seen, [str(borrowing.id) for borrowing in borrowings])
+    
+    def test_history_rows_render_without_lazy_loads(self):
+        """Test history listings load every rendered column in the page query."""
+        self.user.groups.add(get_or_create_group('ADMIN'))
+        late = timezone.now().date() - timedelta(days=2)
+        borrowing = BorrowingService.create_borrowing(self.member, self.book, due_date=late)
+        BorrowingService.return_borrowing(borrowing.id)
+        
+        for url, field, expected in (
+            (f'/api/v1/members/{self.member.id}/borrowing_history/', 'book_title', 'Test Book'),
+            (f'/api/v1/books/{self.book.id}/borrowing_history/', 'member_name', 'Test User'),
+        ):
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            result = response.data['results'][0]
+            self.assertEqual(result['fine']['amount'], '2.00')
+            self.assertEqual(result[field], expected)
+            # The member or book, the count and the page; nothing lazy
+            self.assertEqual(len(queries), 3, url)
+            self.assertNotIn('"notes"', queries[-1]['sql'])
+    
+    def test_role_checks_load_groups_once(self):
+        """Test the staff checks in get_queryset and the action share one lookup."""
+        self.user.groups.add(get_or_create_group('ADMIN'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                f'/api/v1/members/{self.member.id}/borrowing_history/'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        group_queries = [q for q in queries if 'auth_user_groups' in q['sql']]
+        self.assertEqual(len(group_queries), 1)
+    
+    def test_list_query_count_does_not_grow_with_rows(self):
+        """Test borrowing and fine lists load related rows in the page query."""
+        self.user.groups.add(get_or_create_group('ADMIN'))
+        Book.objects.filter(id=self.book.id).update(total_copies=3, available_copies=3)
+        late = timezone.now().date() - timedelta(days=1)
+        urls = ['/api/v1/borrowings/', '/api/v1/fines/']
+        
+        def add_late_return(member):
+            borrowing = BorrowingService.create_borrowing(member, self.book, due_date=late)
+            BorrowingService.return_borrowing(borrowing.id)
+        
+        add_late_return(self.member)
+        # The forced user keeps its roles after the first request
+        self.client.get(urls[0])
+        baseline = {}
+        for url in urls:
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(url)
+            baseline[url] = len(queries)
+        
+        for number in ('MEM051', 'MEM052'):
+            add_late_return(Member.objects.create(
+                first_name='Other',
+                last_name='Reader',
+                email=f'{number}@example.com',
+                membership_number=number
+            ))
+        for url in urls:
+            with self.assertNumQueries(baseline[url]):
+                response = self.client.get(url)
+            self.assertEqual(response.data['count'], 3)
+
+
+@override_settings(SHARED_CACHE=True)
+class TokenRolesCacheTests(TestCase):
+    """Test cases for invalidating cached token roles."""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='reader', password=None)
+        self.group = get_or_create_group('LIBRARIAN')
+        self.user.groups.add(self.group)
+        self.token = APIToken.objects.create(user=self.user)
+        self.cache_key = APIToken.roles_cache_key(self.token.key)
+        APIToken.get_cached_roles(self.token.key, self.user)
+        self.addCleanup(cache.delete, self.cache_key)
+    
+    def test_group_rename_drops_cached_roles(self):
+        """Test renaming a group drops its members' cached roles."""
+        self.assertEqual(cache.get(self.cache_key), frozenset({'LIBRARIAN'}))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.name = 'STAFF'
+            self.group.save()
+        self.assertIsNone(cache.get(self.cache_key))
+    
+    def test_group_delete_drops_cached_roles(self):
+        """Test deleting a group drops its members' cached roles."""
+        self.assertEqual(cache.get(self.cache_key), frozenset({'LIBRARIAN'}))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.delete()
+        self.assertIsNone(cache.get(self.cache_key))
+        self.assertEqual(APIToken.get_cached_roles(self.token.key, self.user), frozenset())
+
+
+class HealthCheckTests(SimpleTestCase):
+    """Test cases for the health check endpoint."""
+    
+    def test_health_check(self):
+        """Test the probe answers without authentication or database access."""
+        response = self.client.get('/api/health/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.json(), {'status': 'healthy'})
+        self.assertEqual(
+            self.client.post('/api/health/').status_code,
+            status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+
+class QueuedRotatingFileHandlerTests(SimpleTestCase):
+    """Test cases for the queued log file handler."""
+    
+    def test_records_written_by_listener(self):
+        """Test records reach the file formatted by the configured formatter."""
+        with tempfile.TemporaryDirectory() as log_dir:
+            filename = os.path.join(log_dir, 'application.log')
+            handler = QueuedRotatingFileHandler(filename)
+            handler.setFormatter(logging.Formatter('{levelname} {message}', style='{'))
+            logger = logging.getLogger('library_service.tests.queued')
+            logger.addHandler(handler)
+            try:
+                logger.warning('Borrowing %s returned', 'abc')
+            finally:
+                logger.removeHandler(handler)
+                handler.close()
+            
+            with open(filename) as log_file:
+                self.assertEqual(log_file.read(), 'WARNING Borrowing abc returned\n')
@@ -2,7 +2,7 @@
 Unit tests for RBAC permission classes.
 """
 from django.test import TestCase
-from django.contrib.auth.models import User, Group
+from django.contrib.auth.models import AnonymousUser, User, Group
 from rest_framework.test import APIRequestFactory
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -21,115 +21,79 @@ class MockView(APIView):
         return Response({'message': 'success'})
 
 
+# (permission class, user fixture, expected result)
+PERMISSION_CASES = [
+    (IsAdmin, 'admin_user', True),
+    (IsAdmin, 'librarian_user', False),
+    (IsAdmin, 'member_user', False),
+    (IsLibrarian, 'librarian_user', True),
+    (IsLibrarian, 'admin_user', False),
+    (IsAdminOrLibrarian, 'admin_user', True),
+    (IsAdminOrLibrarian, 'librarian_user', True),
+    (IsAdminOrLibrarian, 'member_user', False),
+    (IsMember, 'member_user', True),
+    (IsMember, 'admin_user', False),
+]
+
+
 class PermissionClassesTestCase(TestCase):
     """Test cases for RBAC permission classes."""
 
-    def setUp(self):
+    @classmethod
+    def setUpTestData(cls):
         """Set up test users and groups."""
-        self.factory = APIRequestFactory()
-        
         # Create groups
-        self.admin_group = Group.objects.create(name='ADMIN')
-        self.librarian_group = Group.objects.create(name='LIBRARIAN')
-        self.member_group = Group.objects.create(name='MEMBER')
-        
-        # Create users
-        self.admin_user = User.objects.create_user(username='admin', password='pass')
-        self.admin_user.groups.add(self.admin_group)
+        cls.admin_group, cls.librarian_group, cls.member_group = Group.objects.bulk_create([
+            Group(name='ADMIN'),
+            Group(name='LIBRARIAN'),
+            Group(name='MEMBER'),
+        ])
         
-        self.librarian_user = User.objects.create_user(username='librarian', password='pass')
-        self.librarian_user.groups.add(self.librarian_group)
+        # Create users; passwords are never checked, so leave them unusable
+        cls.admin_user = User.objects.create_user(username='admin')
+        cls.admin_user.groups.add(cls.admin_group)
         
-        self.member_user = User.objects.create_user(username='member', password='pass')
-        self.member_user.groups.add(self.member_group)
+        cls.librarian_user = User.objects.create_user(username='librarian')
+        cls.librarian_user.groups.add(cls.librarian_group)
         
-        self.no_group_user = User.objects.create_user(username='nogroup', password='pass')
+        cls.member_user = User.objects.create_user(username='member')
+        cls.member_user.groups.add(cls.member_group)
         
-        self.view = MockView.as_view()
+        cls.no_group_user = User.objects.create_user(username='nogroup')
 
-    def test_is_admin_permission_allows_admin(self):
-        """Test IsAdmin allows users in ADMIN group."""
-        request = self.factory.get('/')
-        request.user = self.admin_user
-        
-        permission = IsAdmin()
-        self.assertTrue(permission.has_permission(request, MockView))
-
-    def test_is_admin_permission_denies_non_admin(self):
-        """Test IsAdmin denies users not in ADMIN group."""
-        request = self.factory.get('/')
-        request.user = self.librarian_user
-        
-        permission = IsAdmin()
-        self.assertFalse(permission.has_permission(request, MockView))
-
-    def test_is_admin_permission_denies_member(self):
-        """Test IsAdmin denies MEMBER users."""
-        request = self.factory.get('/')
-        request.user = self.member_user
-        
-        permission = IsAdmin()
-        self.assertFalse(permission.has_permission(request, MockView))
-
-    def test_is_librarian_permission_allows_librarian(self):
-        """Test IsLibrarian allows users in LIBRARIAN group."""
-        request = self.factory.get('/')
-        request.user = self.librarian_user
-        
-        permission = IsLibrarian()
-        self.assertTrue(permission.has_permission(request, MockView))
-
-    def test_is_librarian_permission_denies_non_librarian(self):
-        """Test IsLibrarian denies users not in LIBRARIAN group."""
-        request = self.factory.get('/')
-        request.user = self.admin_user
-        
-        permission = IsLibrarian()
-        self.assertFalse(permission.has_permission(request, MockView))
-
-    def test_is_admin_or_librarian_allows_admin(self):
-        """Test IsAdminOrLibrarian allows ADMIN users."""
-        request = self.factory.get('/')
-        request.user = self.admin_user
-        
-        permission = IsAdminOrLibrarian()
-        self.assertTrue(permission.has_permission(request, MockView))
-
-    def test_is_admin_or_librarian_allows_librarian(self):
-        """Test IsAdminOrLibrarian allows LIBRARIAN users."""
-        request = self.factory.get('/')
-        request.user = self.librarian_user
-        
-        permission = IsAdminOrLibrarian()
-        self.assertTrue(permission.has_permission(request, MockView))
-
-    def test_is_admin_or_librarian_denies_member(self):
-        """Test IsAdminOrLibrarian denies MEMBER users."""
-        request = self.factory.get('/')
-        request.user = self.member_user
-        
-        permission = IsAdminOrLibrarian()
-        self.assertFalse(permission.has_permission(request, MockView))
-
-    def test_is_member_permission_allows_member(self):
-        """Test IsMember allows users in MEMBER group."""
-        request = self.factory.get('/')
-        request.user = self.member_user
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.view = MockView.as_view()
         
-        permission = IsMember()
-        self.assertTrue(permission.has_permission(request, MockView))
-
-    def test_is_member_permission_denies_non_member(self):
-        """Test IsMember denies users not in MEMBER group."""
+        # Reload with groups prefetched so permission checks don't query.
+        # Done per test: class-level prefetch caches don't survive the copy
+        # TestCase makes of setUpTestData attributes.
+        users = User.objects.prefetch_related('groups').in_bulk([
+            self.admin_user.pk,
+            self.librarian_user.pk,
+            self.member_user.pk,
+            self.no_group_user.pk,
+        ])
+        self.admin_user = users[self.admin_user.pk]
+        self.librarian_user = users[self.librarian_user.pk]
+        self.member_user = users[self.member_user.pk]
+        self.no_group_user = users[self.no_group_user.pk]
+
+    def test_permission_matrix(self):
+        """Test each role is allowed or denied by each permission class."""
         request = self.factory.get('/')
-        request.user = self.admin_user
-        
-        permission = IsMember()
-        self.assertFalse(permission.has_permission(request, MockView))
+        # Groups are prefetched in setUp, so no check should hit the database
+        with self.assertNumQueries(0):
+            for permission_class, user_attr, expected in PERMISSION_CASES:
+                with self.subTest(permission=permission_class.__name__, user=user_attr):
+                    request.user = getattr(self, user_attr)
+                    self.assertEqual(
+                        permission_class().has_permission(request, MockView),
+                        expected
+                    )
 
     def test_permissions_deny_unauthenticated(self):
         """Test all permissions deny unauthenticated users."""
-        from django.contrib.auth.models import AnonymousUser
         request = self.factory.get('/')
         request.user = AnonymousUser()
         
@@ -146,8 +110,9 @@ class PermissionClassesTestCase(TestCase):
         request.user = self.no_group_user
         
         permissions = [IsAdmin(), IsLibrarian(), IsAdminOrLibrarian(), IsMember()]
-        for permission in permissions:
-            self.assertFalse(
-                permission.has_permission(request, MockView),
-                f"{permission.__class__.__name__} should deny users with no groups"
-            )
+        with self.assertNumQueries(0):
+            for permission in permissions:
+                self.assertFalse(
+                    permission.has_permission(request, MockView),
+                    f"{permission.__class__.__name__} should deny users with no groups"
+                )
@@ -1,94 +1,111 @@
 """
 Integration tests for RBAC-protected API endpoints.
 """
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 from decimal import Decimal
 
+from library_service.apps.core import utils
 from library_service.apps.core.models import Member, Book, Borrowing, Fine, APIToken
+from library_service.apps.core.services import BorrowingService
 
+THREE = Decimal('3.00')
+FIVE = Decimal('5.00')
 
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
 class RBACIntegrationTestCase(TestCase):
     """Integration tests for RBAC on API endpoints."""
 
-    def setUp(self):
-        """Set up test data and clients."""
+    @classmethod
+    def setUpTestData(cls):
+        """Set up test users, members and a book."""
         # Create groups
-        self.admin_group, _ = Group.objects.get_or_create(name='ADMIN')
-        self.librarian_group, _ = Group.objects.get_or_create(name='LIBRARIAN')
-        self.member_group, _ = Group.objects.get_or_create(name='MEMBER')
-        
-        # Create users
-        self.admin_user = User.objects.create_user(
-            username='admin@test.com',
-            email='admin@test.com',
-            password='pass123'
-        )
-        self.admin_user.groups.add(self.admin_group)
-        self.admin_token = APIToken.objects.create(user=self.admin_user)
-        
-        self.librarian_user = User.objects.create_user(
-            username='librarian@test.com',
-            email='librarian@test.com',
-            password='pass123'
-        )
-        self.librarian_user.groups.add(self.librarian_group)
-        self.librarian_token = APIToken.objects.create(user=self.librarian_user)
-        
-        self.member_user = User.objects.create_user(
-            username='member@test.com',
-            email='member@test.com',
-            password='pass123'
-        )
-        self.member_user.groups.add(self.member_group)
-        self.member_token = APIToken.objects.create(user=self.member_user)
-        
-        # Create corresponding Member records
-        self.admin_member = Member.objects.create(
-            first_name='Admin',
-            last_name='User',
-            email='admin@test.com',
-            membership_number='ADMIN-001',
-            membership_status='active'
-        )
-        
-        self.librarian_member = Member.objects.create(
-            first_name='Librarian',
-            last_name='User',
-            email='librarian@test.com',
-            membership_number='LIB-001',
-            membership_status='active'
-        )
-        
-        self.member_record = Member.objects.create(
-            first_name='Member',
-            last_name='User',
-            email='member@test.com',
-            membership_number='MEM-001',
-            membership_status='active'
-        )
+        cls.admin_group, cls.librarian_group, cls.member_group = Group.objects.bulk_create([
+            Group(name='ADMIN'),
+            Group(name='LIBRARIAN'),
+            Group(name='MEMBER'),
+        ])
+        
+        # Create users; requests authenticate by token, so no passwords
+        cls.admin_user, cls.librarian_user, cls.member_user = users = [
+            User(username=email, email=email)
+            for email in ('admin@test.com', 'librarian@test.com', 'member@test.com')
+        ]
+        for user in users:
+            user.set_unusable_password()
+        User.objects.bulk_create(users)
+        User.groups.through.objects.bulk_create([
+            User.groups.through(user=cls.admin_user, group=cls.admin_group),
+            User.groups.through(user=cls.librarian_user, group=cls.librarian_group),
+            User.groups.through(user=cls.member_user, group=cls.member_group),
+        ])
+        # Keys are set up front so bulk_create can skip APIToken.save()
+        cls.admin_key, cls.librarian_key, cls.member_key = raw_keys = [
+            APIToken.generate_key() for user in users
+        ]
+        APIToken.objects.bulk_create([
+            APIToken(key=APIToken.hash_key(raw_key), user=user)
+            for raw_key, user in zip(raw_keys, users)
+        ])
+        
+        # Create corresponding Member records; the users above already
+        # exist, so the Member -> User sync signal has nothing to do
+        cls.admin_member, cls.librarian_member, cls.member_record = Member.objects.bulk_create([
+            Member(
+                first_name='Admin',
+                last_name='User',
+                email='admin@test.com',
+                membership_number='ADMIN-001',
+                membership_status='active'
+            ),
+            Member(
+                first_name='Librarian',
+                last_name='User',
+                email='librarian@test.com',
+                membership_number='LIB-001',
+                membership_status='active'
+            ),
+            Member(
+                first_name='Member',
+                last_name='User',
+                email='member@test.com',
+                membership_number='MEM-001',
+                membership_status='active'
+            ),
+        ])
         
         # Create a sample book
-        self.book = Book.objects.create(
+        cls.book = Book.objects.create(
             title='Test Book',
             author='Test Author',
             total_copies=5,
             available_copies=5
         )
-        
+
+    def setUp(self):
+        """Set up API clients for each role."""
         # Create API clients
         self.admin_client = APIClient()
-        self.admin_client.credentials(HTTP_AUTHORIZATION=f'Token {self.admin_token.key}')
+        self.admin_client.credentials(HTTP_AUTHORIZATION=f'Token {self.admin_key}')
         
         self.librarian_client = APIClient()
-        self.librarian_client.credentials(HTTP_AUTHORIZATION=f'Token {self.librarian_token.key}')
+        self.librarian_client.credentials(HTTP_AUTHORIZATION=f'Token {self.librarian_key}')
         
         self.member_client = APIClient()
-        self.member_client.credentials(HTTP_AUTHORIZATION=f'Token {self.member_token.key}')
+        self.member_client.credentials(HTTP_AUTHORIZATION=f'Token {self.member_key}')
         
         self.anon_client = APIClient()
+        
+        # Token roles are cached across requests; rolled-back group changes
+        # must not leak into the next test
+        self.addCleanup(cache.clear)
 
     def test_book_create_requires_admin_or_librarian(self):
         """Test book creation requires ADMIN or LIBRARIAN role."""
@@ -115,6 +132,109 @@ class RBACIntegrationTestCase(TestCase):
         response = self.anon_client.post('/api/v1/books/', book_data)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
+    @override_settings(SHARED_CACHE=True)
+    def test_group_change_invalidates_cached_roles(self):
+        """Test removing a role takes effect on the token's next request."""
+        book_data = {'title': 'New Book', 'author': 'New Author', 'total_copies': 1}
+        response = self.librarian_client.post('/api/v1/books/', book_data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.librarian_user.groups.remove(self.librarian_group)
+        
+        response = self.librarian_client.post('/api/v1/books/', book_data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_revoked_role_applies_without_local_invalidation(self):
+        """Test a role revoked elsewhere is honoured without a shared cache."""
+        book_data = {'title': 'New Book', 'author': 'New Author', 'total_copies': 1}
+        response = self.librarian_client.post('/api/v1/books/', book_data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        # A through-table delete sends no m2m_changed, like a change made
+        # by another worker whose invalidation never reaches this process
+        User.groups.through.objects.filter(
+            user=self.librarian_user, group=self.librarian_group
+        ).delete()
+        
+        response = self.librarian_client.post('/api/v1/books/', book_data)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_tokens_are_stored_hashed(self):
+        """Test the raw token is never stored and its digest still authenticates."""
+        self.assertFalse(APIToken.objects.filter(key=self.admin_key).exists())
+        self.assertTrue(
+            APIToken.objects.filter(key=APIToken.hash_key(self.admin_key)).exists()
+        )
+        
+        digest_client = APIClient()
+        digest_client.credentials(
+            HTTP_AUTHORIZATION=f'Token {APIToken.hash_key(self.admin_key)}'
+        )
+        response = digest_client.get('/api/v1/books/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_login_keeps_newest_tokens_only(self):
+        """Test repeated logins revoke the oldest tokens past the cap."""
+        self.member_record.set_password('StrongPassword123')
+        self.member_record.save()
+        credentials = {'email': 'member@test.com', 'password': 'StrongPassword123'}
+        
+        # Together with the token from setUpTestData, one over the cap
+        raw_keys = []
+        for _ in range(APIToken.MAX_TOKENS_PER_USER):
+            response = self.anon_client.post('/api/v1/auth/login/', credentials)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            raw_keys.append(response.data['token'])
+        
+        self.assertEqual(
+            APIToken.objects.filter(user=self.member_user).count(),
+            APIToken.MAX_TOKENS_PER_USER
+        )
+        expected = ((self.member_key, False), (raw_keys[0], True), (raw_keys[-1], True))
+        for raw_key, still_valid in expected:
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Token {raw_key}')
+            response = client.get('/api/v1/books/')
+            self.assertEqual(response.status_code == status.HTTP_200_OK, still_valid)
+
+    def test_signup_reuses_member_role_id(self):
+        """Test the MEMBER group is looked up once per process, not per signup."""
+        self.addCleanup(utils._ROLE_IDS.clear)
+        utils._ROLE_IDS.clear()
+        
+        def signup(email):
+            return self.anon_client.post('/api/v1/auth/signup/', {
+                'first_name': 'New',
+                'last_name': 'Reader',
+                'email': email,
+                'password': 'StrongPassword123',
+                'password_confirm': 'StrongPassword123',
+            })
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            response = signup('first@test.com')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = signup('second@test.com')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse([q for q in queries if 'FROM "auth_group"' in q['sql']])
+        self.assertTrue(
+            User.objects.get(username='second@test.com').groups.filter(name='MEMBER').exists()
+        )
+
+    def test_last_used_at_written_once_per_interval(self):
+        """Test repeated requests record token use without a write each time."""
+        self.member_client.get('/api/v1/books/')
+        token = APIToken.objects.get(user=self.member_user)
+        self.assertIsNotNone(token.last_used_at)
+        
+        APIToken.objects.filter(pk=token.pk).update(last_used_at=None)
+        self.member_client.get('/api/v1/books/')
+        token.refresh_from_db()
+        self.assertIsNone(token.last_used_at)
+
     def test_book_update_requires_admin_or_librarian(self):
         """Test book update requires ADMIN or LIBRARIAN role."""
         update_data = {'title': 'Updated Title'}
@@ -188,9 +308,7 @@ class RBACIntegrationTestCase(TestCase):
         
         # Admin can create
         response = self.admin_client.post('/api/v1/borrowings/', borrowing_data, format='json')
-        if response.status_code != status.HTTP_201_CREATED:
-            print(f"Admin create failed with: {response.status_code}, {response.data}")
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
         
         # Create another book for librarian test
         book2 = Book.objects.create(
@@ -203,9 +321,7 @@ class RBACIntegrationTestCase(TestCase):
         
         # Librarian can create
         response = self.librarian_client.post('/api/v1/borrowings/', borrowing_data, format='json')
-        if response.status_code != status.HTTP_201_CREATED:
-            print(f"Librarian create failed with: {response.status_code}, {response.data}")
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
         
         # Member cannot create
         book3 = Book.objects.create(
@@ -253,12 +369,71 @@ class RBACIntegrationTestCase(TestCase):
         # Admin sees all
         response = self.admin_client.get('/api/v1/borrowings/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.data['results']), 2)
+        self.assertEqual(
+            {result['id'] for result in response.data['results']},
+            {str(borrowing1.id), str(borrowing2.id)}
+        )
         
         # Librarian sees all
         response = self.librarian_client.get('/api/v1/borrowings/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertGreaterEqual(len(response.data['results']), 2)
+        self.assertEqual(
+            {result['id'] for result in response.data['results']},
+            {str(borrowing1.id), str(borrowing2.id)}
+        )
+
+    def test_member_lookup_shared_within_request(self):
+        """Test get_queryset and the ownership check share one Member lookup."""
+        Borrowing.objects.create(member=self.member_record, book=self.book)
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.member_client.get(
+                f'/api/v1/members/{self.member_record.id}/active_borrowings/'
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        email_lookups = [
+            query for query in queries
+            if 'core_member' in query['sql'] and '"email" =' in query['sql']
+        ]
+        self.assertEqual(len(email_lookups), 1)
+        
+        # Someone else's member record is still hidden from a MEMBER
+        response = self.member_client.get(
+            f'/api/v1/members/{self.admin_member.id}/active_borrowings/'
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_member_listings_not_cached_without_shared_cache(self):
+        """Test listings reflect writes no invalidation reached."""
+        url = f'/api/v1/members/{self.member_record.id}/active_borrowings/'
+        borrowing = Borrowing.objects.create(member=self.member_record, book=self.book)
+        response = self.member_client.get(url)
+        self.assertEqual(response.data['count'], 1)
+        
+        # A queryset update sends no signal, like a write in another worker
+        Borrowing.objects.filter(pk=borrowing.pk).update(returned_at=timezone.now())
+        response = self.member_client.get(url)
+        self.assertEqual(response.data['count'], 0)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_member_listings_cached_until_borrowings_change(self):
+        """Test repeat listing polls skip the borrowing queries until a write."""
+        url = f'/api/v1/members/{self.member_record.id}/active_borrowings/'
+        with self.captureOnCommitCallbacks(execute=True):
+            borrowing = Borrowing.objects.create(member=self.member_record, book=self.book)
+        
+        response = self.member_client.get(url)
+        self.assertEqual(response.data['count'], 1)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.member_client.get(url)
+        self.assertEqual(response.data['count'], 1)
+        self.assertFalse([q for q in queries if 'core_borrowing' in q['sql']])
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            BorrowingService.return_borrowing(borrowing.id)
+        response = self.member_client.get(url)
+        self.assertEqual(response.data['count'], 0)
 
     def test_return_book_requires_admin_or_librarian(self):
         """Test return_book action requires ADMIN or LIBRARIAN role."""
@@ -299,7 +474,7 @@ class RBACIntegrationTestCase(TestCase):
         )
         fine = Fine.objects.create(
             borrowing=borrowing,
-            amount=Decimal('5.00'),
+            amount=FIVE,
             reason='Test fine'
         )
         
@@ -324,7 +499,7 @@ class RBACIntegrationTestCase(TestCase):
         )
         fine2 = Fine.objects.create(
             borrowing=borrowing2,
-            amount=Decimal('3.00'),
+            amount=THREE,
             reason='Test fine 2'
         )
         
@@ -338,10 +513,26 @@ class RBACIntegrationTestCase(TestCase):
         response = self.member_client.post(f'/api/v1/members/{self.member_record.id}/suspend/')
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         
-        # Admin can suspend
+        # Admin can suspend; the member's login is disabled with it
         response = self.admin_client.post(f'/api/v1/members/{self.member_record.id}/suspend/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        
-        # Librarian can activate
-        response = self.librarian_client.post(f'/api/v1/members/{self.member_record.id}/activate/')
+        self.assertEqual(response.data['membership_status'], 'suspended')
+        self.member_user.refresh_from_db(fields=['is_active'])
+        self.assertFalse(self.member_user.is_active)
+        
+        # Librarian can activate; only the member's id and email are read
+        with CaptureQueriesContext(connection) as queries:
+            response = self.librarian_client.post(
+                f'/api/v1/members/{self.member_record.id}/activate/'
+            )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['membership_status'], 'active')
+        member_reads = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT') and 'core_member' in query['sql']
+        ]
+        self.assertEqual(len(member_reads), 1)
+        self.assertNotIn('first_name', member_reads[0])
+        self.assertNotIn('COUNT(', member_reads[0])
+        self.member_user.refresh_from_db(fields=['is_active'])
+        self.assertTrue(self.member_user.is_active)
@@ -1,8 +1,7 @@
 """
 URL configuration for the core library service.
 """
-from django.urls import path, include
-from rest_framework.routers import DefaultRouter
+from rest_framework.routers import SimpleRouter
 from .views import (
     MemberViewSet,
     BookViewSet,
@@ -12,13 +11,12 @@ from .views import (
 
 app_name = 'core'
 
-# Create router and register viewsets
-router = DefaultRouter()
+# Create router and register viewsets; no browsable API root or format suffixes
+router = SimpleRouter()
 router.register(r'members', MemberViewSet, basename='member')
 router.register(r'books', BookViewSet, basename='book')
 router.register(r'borrowings', BorrowingViewSet, basename='borrowing')
 router.register(r'fines', FineViewSet, basename='fine')
 
-urlpatterns = [
-    path('', include(router.urls)),
-]
+# The router's patterns directly, without an extra empty-prefix resolver
+urlpatterns = router.urls
@@ -2,8 +2,14 @@
 Utility helpers for role management.
 """
 from django.contrib.auth.models import Group, User
-from django.db import transaction
-from typing import Optional
+from django.db import IntegrityError, transaction
+from typing import Dict, Iterable, Optional
+
+ROLE_NAMES = ('ADMIN', 'LIBRARIAN', 'MEMBER')
+
+# Role group ids by name, filled by the first lookup of each role in a
+# process (or by `ensure_roles_exist()`); cleared if any group is deleted.
+_ROLE_IDS: Dict[str, int] = {}
 
 
 def get_or_create_group(name: str) -> Group:
@@ -12,7 +18,29 @@ def get_or_create_group(name: str) -> Group:
     return group
 
 
-@transaction.atomic
+def get_role_id(name: str) -> int:
+    """Return the id of the role group `name`, creating the group if missing.
+
+    The id is remembered once the surrounding transaction commits, so later
+    lookups skip the query and a rolled-back creation is never remembered.
+    """
+    role_id = _ROLE_IDS.get(name)
+    if role_id is None:
+        role_id = get_or_create_group(name).pk
+        transaction.on_commit(lambda: _ROLE_IDS.setdefault(name, role_id))
+    return role_id
+
+
+def ensure_roles_exist() -> Dict[str, int]:
+    """Create the standard role groups if missing and remember their ids.
+
+    Warms the cache behind `get_role_id` for every role at once.
+    """
+    for name in ROLE_NAMES:
+        _ROLE_IDS[name] = get_or_create_group(name).pk
+    return dict(_ROLE_IDS)
+
+
 def assign_default_member_role(user: Optional[User]):
     """Assign the `MEMBER` role to the given Django `User`.
 
@@ -20,12 +48,79 @@ def assign_default_member_role(user: Optional[User]):
     """
     if not user:
         return
-    member_group = get_or_create_group('MEMBER')
-    user.groups.add(member_group)
-    user.save()
+    # The M2M add writes the through row itself; the user row is unchanged
+    user.groups.add(get_role_id('MEMBER'))
+
+
+def sync_users_for_members(members: Iterable) -> int:
+    """Create or update the Django `User` rows for many `Member` objects at once.
+
+    Bulk counterpart of the `post_save` signal: one lookup of the existing
+    users, one `bulk_create` for the missing ones, one `update` per active
+    state and one `bulk_create` on the `User.groups` through table to give
+    the new users the `MEMBER` role. Returns the number of users this call
+    created; users another process created meanwhile are not counted.
+    """
+    wanted = {}
+    for member in members:
+        if member.email:
+            wanted[member.email] = member
+    if not wanted:
+        return 0
+
+    existing = {
+        username: (user_id, is_active)
+        for username, user_id, is_active in User.objects.filter(
+            username__in=list(wanted)
+        ).values_list('username', 'id', 'is_active')
+    }
+
+    new_users = []
+    to_activate, to_deactivate = [], []
+    for email, member in wanted.items():
+        is_active = (member.membership_status == 'active')
+        if email not in existing:
+            user = User(
+                username=email,
+                first_name=member.first_name or '',
+                last_name=member.last_name or '',
+                email=email,
+                is_active=is_active,
+            )
+            user.set_unusable_password()
+            new_users.append(user)
+        elif existing[email][1] != is_active:
+            (to_activate if is_active else to_deactivate).append(existing[email][0])
 
+    with transaction.atomic():
+        if to_activate:
+            User.objects.filter(id__in=to_activate).update(is_active=True)
+        if to_deactivate:
+            User.objects.filter(id__in=to_deactivate).update(is_active=False)
+        if not new_users:
+            return 0
 
-def ensure_roles_exist():
-    """Ensure the standard roles exist: ADMIN, LIBRARIAN, MEMBER."""
-    for name in ('ADMIN', 'LIBRARIAN', 'MEMBER'):
-        get_or_create_group(name)
+        try:
+            with transaction.atomic():
+                created = User.objects.bulk_create(new_users)
+        except IntegrityError:
+            # Some of these users were created concurrently; create the rest
+            taken = set(User.objects.filter(
+                username__in=[user.username for user in new_users]
+            ).values_list('username', flat=True))
+            created = User.objects.bulk_create(
+                [user for user in new_users if user.username not in taken]
+            )
+        new_ids = [user.pk for user in created]
+        if None in new_ids:
+            # Backends that can't return ids from a bulk insert
+            new_ids = User.objects.filter(
+                username__in=[user.username for user in created]
+            ).values_list('id', flat=True)
+        member_group_id = get_role_id('MEMBER')
+        through = User.groups.through
+        through.objects.bulk_create(
+            [through(user_id=user_id, group_id=member_group_id) for user_id in new_ids],
+            ignore_conflicts=True,
+        )
+    return len(created)
@@ -3,10 +3,15 @@ Views for the core library service application.
 """
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from rest_framework.filters import SearchFilter, OrderingFilter
+from django.db.models import Count, F, Q
 from django.utils import timezone
 from datetime import timedelta
 import logging
@@ -17,14 +22,61 @@ from .serializers import (
     BookSerializer,
     BorrowingListSerializer,
     BorrowingDetailSerializer,
-    FineSerializer
+    BulkBorrowingSerializer,
+    FineSerializer,
+    IncreaseCopiesSerializer,
+    BORROWING_LIST_VALUES,
+    borrowing_list_rows,
 )
 from .filters import BorrowingFilterSet, BookFilterSet, MemberFilterSet
-from .pagination import StandardResultsSetPagination
-from .permissions import IsAdmin, IsAdminOrLibrarian, IsMember
+from .authentication import APITokenAuthentication
+from .pagination import (
+    BorrowingCursorPagination,
+    OverdueCursorPagination,
+    StandardResultsSetPagination,
+)
+from .permissions import IsAdmin, IsAdminOrLibrarian, IsMember, is_admin_or_librarian
+from .services import BorrowingService
+from .exceptions import BorrowingError
 
 logger = logging.getLogger(__name__)
 
+# Permission classes hold no state, so every request shares these instances
+_STAFF_PERMISSIONS = (IsAdminOrLibrarian(),)
+_AUTHENTICATED_PERMISSIONS = (IsAuthenticated(),)
+
+
+def _get_member_id_for_user(request):
+    """Return the id of the Member linked to the request's user, or None.
+
+    Looked up once per request and kept on it, so get_queryset and the
+    action's own ownership check share one query. Only the id is read.
+    """
+    if not hasattr(request, '_cached_member_id'):
+        request._cached_member_id = Member.objects.filter(
+            email=request.user.username
+        ).values_list('id', flat=True).first()
+    return request._cached_member_id
+
+
+def _borrowing_list_response(view, queryset):
+    """Paginate borrowings and render the page from a single values() query."""
+    queryset = queryset.values(*BORROWING_LIST_VALUES)
+    page = view.paginate_queryset(queryset)
+    if page is not None:
+        return view.get_paginated_response(borrowing_list_rows(page))
+    return Response(borrowing_list_rows(queryset))
+
+
+def _use_cursor_pagination(view, pagination_class=BorrowingCursorPagination):
+    """Page the current action by keyset when the client passes `?cursor=`.
+
+    Without it the action keeps page-number pagination, whose `count` and
+    page links the web UI relies on.
+    """
+    if pagination_class.cursor_query_param in view.request.query_params:
+        view._paginator = pagination_class()
+
 
 class MemberViewSet(viewsets.ModelViewSet):
     """
@@ -36,6 +88,7 @@ class MemberViewSet(viewsets.ModelViewSet):
     """
     queryset = Member.objects.all()
     serializer_class = MemberSerializer
+    authentication_classes = [APITokenAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -46,27 +99,41 @@ class MemberViewSet(viewsets.ModelViewSet):
 
     def get_permissions(self):
         """Apply different permissions based on action."""
-        if self.action in ['create', 'update', 'partial_update', 'destroy', 'suspend', 'activate']:
-            return [IsAdminOrLibrarian()]
-        if self.action in ['change_password']:
-            return [IsAuthenticated()]  # Members can change their own password
-        return [IsAuthenticated()]
+        if self.action in ('create', 'update', 'partial_update', 'destroy', 'suspend', 'activate'):
+            return _STAFF_PERMISSIONS
+        # Includes change_password: members can change their own password
+        return _AUTHENTICATED_PERMISSIONS
     
     def get_queryset(self):
-        """Filter members: MEMBERs see only their own profile; ADMIN/LIBRARIAN see all."""
+        """Filter members: MEMBERs see only their own profile; ADMIN/LIBRARIAN see all.
+
+        Borrowing counts are annotated so serializing a page costs a single query.
+        """
         queryset = super().get_queryset()
         user = self.request.user
 
+        if self.action in ('suspend', 'activate'):
+            # Status flips only need the row's id and email
+            queryset = queryset.only('id', 'email')
+        elif self.action in ('list', 'retrieve', 'update', 'partial_update'):
+            active = Q(borrowing__returned_at__isnull=True)
+            queryset = queryset.annotate(
+                active_borrowings_total=Count('borrowing', filter=active),
+                overdue_borrowings_total=Count(
+                    'borrowing',
+                    filter=active & Q(borrowing__due_date__lt=timezone.now().date())
+                ),
+            )
+
         # Check if user is ADMIN or LIBRARIAN
-        if user.groups.filter(name__in=['ADMIN', 'LIBRARIAN']).exists():
+        if is_admin_or_librarian(user):
             return queryset
 
         # MEMBERs see only their own profile
-        try:
-            member = Member.objects.get(email=user.username)
-            return queryset.filter(id=member.id)
-        except Member.DoesNotExist:
+        member_id = _get_member_id_for_user(self.request)
+        if member_id is None:
             return queryset.none()
+        return queryset.filter(id=member_id)
 
     def destroy(self, request, *args, **kwargs):
         """Prevent deleting members with active borrowings."""
@@ -88,29 +155,23 @@ class MemberViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         # Check if member user is trying to view someone else's history
-        if not user.groups.filter(name__in=['ADMIN', 'LIBRARIAN']).exists():
-            try:
-                user_member = Member.objects.get(email=user.username)
-                if user_member.id != member.id:
-                    return Response(
-                        {'error': 'You can only view your own borrowing history.'},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            except Member.DoesNotExist:
+        if not is_admin_or_librarian(user):
+            user_member_id = _get_member_id_for_user(request)
+            if user_member_id is None:
                 return Response(
                     {'error': 'Unauthorized'},
                     status=status.HTTP_403_FORBIDDEN
                 )
+            if user_member_id != member.id:
+                return Response(
+                    {'error': 'You can only view your own borrowing history.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
         
-        borrowings = member.borrowing_set.all().order_by('-borrowed_at')
+        borrowings = member.borrowing_set.order_by('-borrowed_at')
         
-        page = self.paginate_queryset(borrowings)
-        if page is not None:
-            serializer = BorrowingListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = BorrowingListSerializer(borrowings, many=True)
-        return Response(serializer.data)
+        _use_cursor_pagination(self)
+        return _borrowing_list_response(self, borrowings)
     
     @action(detail=True, methods=['get'])
     def active_borrowings(self, request, pk=None):
@@ -122,24 +183,21 @@ class MemberViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         # Check if member user is trying to view someone else's borrowings
-        if not user.groups.filter(name__in=['ADMIN', 'LIBRARIAN']).exists():
-            try:
-                user_member = Member.objects.get(email=user.username)
-                if user_member.id != member.id:
-                    return Response(
-                        {'error': 'You can only view your own active borrowings.'},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            except Member.DoesNotExist:
+        if not is_admin_or_librarian(user):
+            user_member_id = _get_member_id_for_user(request)
+            if user_member_id is None:
                 return Response(
                     {'error': 'Unauthorized'},
                     status=status.HTTP_403_FORBIDDEN
                 )
+            if user_member_id != member.id:
+                return Response(
+                    {'error': 'You can only view your own active borrowings.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
         
         borrowings = member.get_active_borrowings()
-        
-        serializer = BorrowingListSerializer(borrowings, many=True)
-        return Response(serializer.data)
+        return self._cached_borrowings_response(member, borrowings)
     
     @action(detail=True, methods=['get'])
     def overdue_borrowings(self, request, pk=None):
@@ -151,48 +209,72 @@ class MemberViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         # Check if member user is trying to view someone else's overdue borrowings
-        if not user.groups.filter(name__in=['ADMIN', 'LIBRARIAN']).exists():
-            try:
-                user_member = Member.objects.get(email=user.username)
-                if user_member.id != member.id:
-                    return Response(
-                        {'error': 'You can only view your own overdue borrowings.'},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            except Member.DoesNotExist:
+        if not is_admin_or_librarian(user):
+            user_member_id = _get_member_id_for_user(request)
+            if user_member_id is None:
                 return Response(
                     {'error': 'Unauthorized'},
                     status=status.HTTP_403_FORBIDDEN
                 )
+            if user_member_id != member.id:
+                return Response(
+                    {'error': 'You can only view your own overdue borrowings.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
         
         borrowings = member.get_overdue_borrowings()
-        
-        serializer = BorrowingListSerializer(borrowings, many=True)
-        return Response(serializer.data)
+        return self._cached_borrowings_response(member, borrowings)
+    
+    def _cached_borrowings_response(self, member, borrowings):
+        """
+        Serve a page of a member's borrowings from the cache when fresh.
+
+        Dashboards poll these listings, so a page is kept for a few seconds
+        and expired by any borrowing or fine write for the member. Access
+        checks run before this on every request. Pages are only cached when
+        settings.SHARED_CACHE is set; a per-process cache would miss writes
+        made through other workers.
+        """
+        if not settings.SHARED_CACHE:
+            return _borrowing_list_response(self, borrowings)
+        cache_key = Member.borrowings_cache_key(
+            member.pk, self.request.build_absolute_uri()
+        )
+        data = cache.get(cache_key)
+        if data is None:
+            data = _borrowing_list_response(self, borrowings).data
+            cache.set(cache_key, data, Member.BORROWINGS_CACHE_TIMEOUT)
+        return Response(data)
+    
+    def _set_membership_status(self, membership_status):
+        """
+        Flip a member's status with narrow UPDATEs and echo the new status.
+        """
+        member = self.get_object()
+        Member.objects.filter(pk=member.pk).update(
+            membership_status=membership_status,
+            updated_at=timezone.now()
+        )
+        # update() skips the Member -> User sync signal, so keep login
+        # access in step here
+        User.objects.filter(username=member.email).update(
+            is_active=(membership_status == 'active')
+        )
+        return Response({'id': str(member.pk), 'membership_status': membership_status})
     
     @action(detail=True, methods=['post'])
     def suspend(self, request, pk=None):
         """
         Suspend a member's account.
         """
-        member = self.get_object()
-        member.membership_status = 'suspended'
-        member.save()
-        
-        serializer = self.get_serializer(member)
-        return Response(serializer.data)
+        return self._set_membership_status('suspended')
     
     @action(detail=True, methods=['post'])
     def activate(self, request, pk=None):
         """
         Activate a member's account.
         """
-        member = self.get_object()
-        member.membership_status = 'active'
-        member.save()
-        
-        serializer = self.get_serializer(member)
-        return Response(serializer.data)
+        return self._set_membership_status('active')
     
     @action(detail=False, methods=['get'])
     def me(self, request):
@@ -220,19 +302,18 @@ class MemberViewSet(viewsets.ModelViewSet):
         user = self.request.user
         
         # Check authorization: member can only change their own password
-        if not user.groups.filter(name__in=['ADMIN', 'LIBRARIAN']).exists():
-            try:
-                user_member = Member.objects.get(email=user.username)
-                if user_member.id != member.id:
-                    return Response(
-                        {'error': 'You can only change your own password.'},
-                        status=status.HTTP_403_FORBIDDEN
-                    )
-            except Member.DoesNotExist:
+        if not is_admin_or_librarian(user):
+            user_member_id = _get_member_id_for_user(request)
+            if user_member_id is None:
                 return Response(
                     {'error': 'Unauthorized'},
                     status=status.HTTP_403_FORBIDDEN
                 )
+            if user_member_id != member.id:
+                return Response(
+                    {'error': 'You can only change your own password.'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
         
         old_password = request.data.get('old_password')
         new_password = request.data.get('new_password')
@@ -252,7 +333,7 @@ class MemberViewSet(viewsets.ModelViewSet):
             )
         
         # For admins/librarians, skip old password verification
-        if not user.groups.filter(name__in=['ADMIN', 'LIBRARIAN']).exists():
+        if not is_admin_or_librarian(user):
             # Member must verify old password
             if not member.check_password(old_password):
                 return Response(
@@ -289,6 +370,7 @@ class BookViewSet(viewsets.ModelViewSet):
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    authentication_classes = [APITokenAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -299,15 +381,31 @@ class BookViewSet(viewsets.ModelViewSet):
 
     def get_permissions(self):
         """Apply different permissions based on action."""
-        if self.action in ['create', 'update', 'partial_update', 'destroy', 'increase_copies']:
-            return [IsAdminOrLibrarian()]
-        return [IsAuthenticated()]
+        if self.action in ('create', 'update', 'partial_update', 'destroy', 'increase_copies'):
+            return _STAFF_PERMISSIONS
+        return _AUTHENTICATED_PERMISSIONS
+
+    def get_queryset(self):
+        """Annotate borrowing counts so serializing a page costs a single query.
+
+        Only actions that serialize books get the counts; the rest look a
+        book up without joining and grouping its borrowings.
+        """
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve', 'update', 'partial_update'):
+            queryset = queryset.annotate(
+                borrowing_total=Count('borrowing'),
+                active_borrowings_total=Count(
+                    'borrowing',
+                    filter=Q(borrowing__returned_at__isnull=True)
+                ),
+            )
+        return queryset
     
     def destroy(self, request, *args, **kwargs):
         """Prevent deleting books with active borrowings."""
         book = self.get_object()
-        active_borrowings = book.borrowing_set.filter(returned_at__isnull=True)
-        if active_borrowings.exists():
+        if book.borrowing_set.active().exists():
             return Response(
                 {'error': 'Cannot delete book with active borrowings.'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -320,15 +418,10 @@ class BookViewSet(viewsets.ModelViewSet):
         Get the borrowing history of a book.
         """
         book = self.get_object()
-        borrowings = book.borrowing_set.all().order_by('-borrowed_at')
-        
-        page = self.paginate_queryset(borrowings)
-        if page is not None:
-            serializer = BorrowingListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        borrowings = book.borrowing_set.order_by('-borrowed_at')
         
-        serializer = BorrowingListSerializer(borrowings, many=True)
-        return Response(serializer.data)
+        _use_cursor_pagination(self)
+        return _borrowing_list_response(self, borrowings)
     
     @action(detail=True, methods=['post'])
     def increase_copies(self, request, pk=None):
@@ -336,24 +429,17 @@ class BookViewSet(viewsets.ModelViewSet):
         Increase the total number of copies of a book.
         """
         book = self.get_object()
-        quantity = request.data.get('quantity', 1)
-        
-        try:
-            quantity = int(quantity)
-            if quantity <= 0:
-                return Response(
-                    {'error': 'Quantity must be positive.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        except (ValueError, TypeError):
-            return Response(
-                {'error': 'Invalid quantity.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        serializer = IncreaseCopiesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quantity = serializer.validated_data['quantity']
         
-        book.total_copies += quantity
-        book.available_copies += quantity
-        book.save()
+        # Add in SQL so concurrent borrows and returns are not overwritten
+        Book.objects.filter(pk=book.pk).update(
+            total_copies=F('total_copies') + quantity,
+            available_copies=F('available_copies') + quantity,
+            updated_at=timezone.now()
+        )
+        book.refresh_from_db(fields=['total_copies', 'available_copies', 'updated_at'])
         
         serializer = self.get_serializer(book)
         return Response(serializer.data)
@@ -363,13 +449,18 @@ class BookViewSet(viewsets.ModelViewSet):
         """
         Get the available count of a book.
         """
-        book = self.get_object()
+        # Every authenticated user can see every book, so read the four
+        # columns directly rather than building an annotated Book instance
+        book = get_object_or_404(
+            Book.objects.values('id', 'title', 'total_copies', 'available_copies'),
+            pk=pk
+        )
         return Response({
-            'book_id': str(book.id),
-            'title': book.title,
-            'total_copies': book.total_copies,
-            'available_copies': book.available_copies,
-            'is_available': book.is_available
+            'book_id': str(book['id']),
+            'title': book['title'],
+            'total_copies': book['total_copies'],
+            'available_copies': book['available_copies'],
+            'is_available': book['available_copies'] > 0
         })
 
 
@@ -382,7 +473,8 @@ class BorrowingViewSet(viewsets.ModelViewSet):
     - Create/Update/Delete: ADMIN or LIBRARIAN only
     - return_book: ADMIN or LIBRARIAN only
     """
-    queryset = Borrowing.objects.all()
+    queryset = Borrowing.objects.select_related('member', 'book', 'fine')
+    authentication_classes = [APITokenAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -392,27 +484,30 @@ class BorrowingViewSet(viewsets.ModelViewSet):
 
     def get_permissions(self):
         """Apply different permissions based on action."""
-        if self.action in ['create', 'update', 'partial_update', 'destroy', 'return_book']:
-            return [IsAdminOrLibrarian()]
-        return [IsAuthenticated()]
+        if self.action in ('create', 'update', 'partial_update', 'destroy', 'return_book', 'bulk'):
+            return _STAFF_PERMISSIONS
+        return _AUTHENTICATED_PERMISSIONS
 
     def get_queryset(self):
         """Filter borrowings: MEMBERs see only their own; ADMIN/LIBRARIAN see all."""
         queryset = super().get_queryset()
         user = self.request.user
 
+        # return_book only needs the row to exist; the service does the
+        # write and reloads the full borrowing for the response itself
+        if self.action == 'return_book':
+            queryset = queryset.select_related(None).only('id')
+
         # Check if user is ADMIN or LIBRARIAN
-        if user.groups.filter(name__in=['ADMIN', 'LIBRARIAN']).exists():
+        if is_admin_or_librarian(user):
             return queryset
 
         # MEMBERs see only their own borrowings
         # Find the Member record linked to this user
-        try:
-            from .models import Member
-            member = Member.objects.get(email=user.username)
-            return queryset.filter(member=member)
-        except Member.DoesNotExist:
+        member_id = _get_member_id_for_user(self.request)
+        if member_id is None:
             return queryset.none()
+        return queryset.filter(member_id=member_id)
     
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
@@ -420,6 +515,11 @@ class BorrowingViewSet(viewsets.ModelViewSet):
             return BorrowingListSerializer
         return BorrowingDetailSerializer
     
+    def list(self, request, *args, **kwargs):
+        """List borrowings, rendered from values() rows."""
+        queryset = self.filter_queryset(self.get_queryset())
+        return _borrowing_list_response(self, queryset)
+    
     def create(self, request, *args, **kwargs):
         """
         Create a new borrowing record (member borrows a book).
@@ -431,21 +531,12 @@ class BorrowingViewSet(viewsets.ModelViewSet):
             member = serializer.validated_data.pop('member')
             book = serializer.validated_data.pop('book')
             
-            # Update book availability
-            book.available_copies -= 1
-            book.save()
-            
-            # Create borrowing record
-            borrowing = Borrowing.objects.create(
-                member=member,
-                book=book,
+            borrowing = BorrowingService.create_borrowing(
+                member,
+                book,
                 **serializer.validated_data
             )
             
-            logger.info(
-                f"Book borrowed: {member.full_name} borrowed {book.title}"
-            )
-            
             output_serializer = BorrowingDetailSerializer(borrowing)
             return Response(output_serializer.data, status=status.HTTP_201_CREATED)
         
@@ -456,6 +547,33 @@ class BorrowingViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
     
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Borrow several books for one member in a single transaction.
+        """
+        serializer = BulkBorrowingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        try:
+            borrowings = BorrowingService.create_borrowings_bulk(
+                serializer.validated_data['member_id'],
+                serializer.validated_data['book_ids'],
+                due_date=serializer.validated_data.get('due_date')
+            )
+        except BorrowingError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Render from one values() query like the list endpoints; new
+        # borrowings have no fine, so there is nothing to load per row
+        rows = Borrowing.objects.filter(
+            pk__in=[borrowing.pk for borrowing in borrowings]
+        ).order_by('book_id').values(*BORROWING_LIST_VALUES)
+        return Response(borrowing_list_rows(rows), status=status.HTTP_201_CREATED)
+    
     @action(detail=True, methods=['post'])
     def return_book(self, request, pk=None):
         """
@@ -463,44 +581,14 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         """
         borrowing = self.get_object()
         
-        if borrowing.returned_at:
+        try:
+            borrowing = BorrowingService.return_borrowing(borrowing.id)
+        except BorrowingError as e:
             return Response(
-                {'error': 'This book has already been returned.'},
+                {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        returned_at = timezone.now()
-        days_overdue = max((returned_at.date() - borrowing.due_date).days, 0)
-
-        # Mark as returned
-        borrowing.returned_at = returned_at
-        borrowing.save()
-        
-        # Update book availability
-        borrowing.book.available_copies += 1
-        borrowing.book.save()
-        
-        # Check for overdue and create fine if needed
-        if days_overdue > 0:
-            fine_amount = days_overdue * 1.00  # $1.00 per day
-
-            Fine.objects.get_or_create(
-                borrowing=borrowing,
-                defaults={
-                    'amount': fine_amount,
-                    'reason': f"Overdue by {days_overdue} days"
-                }
-            )
-
-            logger.warning(
-                f"Fine created: {borrowing.member.full_name} "
-                f"returned {borrowing.book.title} {days_overdue} days late"
-            )
-        
-        logger.info(
-            f"Book returned: {borrowing.member.full_name} returned {borrowing.book.title}"
-        )
-        
         serializer = BorrowingDetailSerializer(borrowing)
         return Response(serializer.data)
     
@@ -511,18 +599,10 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         Respects role-based filtering: MEMBERs see only their own; ADMIN/LIBRARIAN see all.
         """
         # Start with the role-filtered queryset from get_queryset()
-        queryset = self.get_queryset().filter(
-            returned_at__isnull=True,
-            due_date__lt=timezone.now().date()
-        ).order_by('due_date')
-        
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = BorrowingListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
+        queryset = self.get_queryset().overdue().order_by('due_date')
         
-        serializer = BorrowingListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        _use_cursor_pagination(self, OverdueCursorPagination)
+        return _borrowing_list_response(self, queryset)
     
     @action(detail=False, methods=['get'])
     def active(self, request):
@@ -531,17 +611,10 @@ class BorrowingViewSet(viewsets.ModelViewSet):
         Respects role-based filtering: MEMBERs see only their own; ADMIN/LIBRARIAN see all.
         """
         # Start with the role-filtered queryset from get_queryset()
-        queryset = self.get_queryset().filter(
-            returned_at__isnull=True
-        ).order_by('-borrowed_at')
+        queryset = self.get_queryset().active().order_by('-borrowed_at')
         
-        page = self.paginate_queryset(queryset)
-        if page is not None:
-            serializer = BorrowingListSerializer(page, many=True)
-            return self.get_paginated_response(serializer.data)
-        
-        serializer = BorrowingListSerializer(queryset, many=True)
-        return Response(serializer.data)
+        _use_cursor_pagination(self)
+        return _borrowing_list_response(self, queryset)
 
 
 class FineViewSet(viewsets.ReadOnlyModelViewSet):
@@ -550,8 +623,9 @@ class FineViewSet(viewsets.ReadOnlyModelViewSet):
     - List/Read: Any authenticated user
     - mark_as_paid: ADMIN or LIBRARIAN only
     """
-    queryset = Fine.objects.all()
+    queryset = Fine.objects.select_related('borrowing__member', 'borrowing__book')
     serializer_class = FineSerializer
+    authentication_classes = [APITokenAuthentication]
     permission_classes = [IsAuthenticated]
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, OrderingFilter]
@@ -562,8 +636,8 @@ class FineViewSet(viewsets.ReadOnlyModelViewSet):
     def get_permissions(self):
         """Apply IsAdminOrLibrarian permission for mark_as_paid action."""
         if self.action == 'mark_as_paid':
-            return [IsAdminOrLibrarian()]
-        return [IsAuthenticated()]
+            return _STAFF_PERMISSIONS
+        return _AUTHENTICATED_PERMISSIONS
     
     def get_queryset(self):
         """Filter fines: MEMBERs see only their own; ADMIN/LIBRARIAN see all."""
@@ -571,17 +645,15 @@ class FineViewSet(viewsets.ReadOnlyModelViewSet):
         user = self.request.user
 
         # Check if user is ADMIN or LIBRARIAN
-        if user.groups.filter(name__in=['ADMIN', 'LIBRARIAN']).exists():
+        if is_admin_or_librarian(user):
             return queryset
 
         # MEMBERs see only their own fines
-        try:
-            from .models import Member
-            member = Member.objects.get(email=user.username)
-            # Filter fines by borrowing's member
-            return queryset.filter(borrowing__member=member)
-        except Member.DoesNotExist:
+        member_id = _get_member_id_for_user(self.request)
+        if member_id is None:
             return queryset.none()
+        # Filter fines by borrowing's member
+        return queryset.filter(borrowing__member_id=member_id)
     
     @action(detail=True, methods=['post'])
     def mark_as_paid(self, request, pk=None):
@@ -85,13 +85,31 @@ DATABASES = {
         'PASSWORD': env('DB_PASSWORD', default='postgres'),
         'HOST': env('DB_HOST', default='localhost'),
         'PORT': env('DB_PORT', default='5432'),
-        'CONN_MAX_AGE': 600,
+        # Keep connections across requests; check them before reuse so a
+        # restarted database doesn't surface as a failed request
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=600),
+        'CONN_HEALTH_CHECKS': True,
+        # Set when connecting through PgBouncer in transaction pooling mode
+        'DISABLE_SERVER_SIDE_CURSORS': env.bool('DB_DISABLE_SERVER_SIDE_CURSORS', default=False),
         'OPTIONS': {
             'sslmode': 'prefer',
         }
     }
 }
 
+# Cache shared by every API worker. Token roles and member borrowing
+# listings are only cached when it is set: the default LocMemCache is
+# per-process, so invalidation in one gunicorn worker wouldn't reach the rest.
+REDIS_URL = env('REDIS_URL', default='')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+SHARED_CACHE = bool(REDIS_URL)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -128,6 +146,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Django REST Framework configuration
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'library_service.apps.core.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_FILTER_BACKENDS': [
@@ -202,9 +224,10 @@ LOGGING = {
             'class': 'logging.StreamHandler',
             'formatter': 'simple',
         },
+        # Records are queued and written to disk on a background thread
         'file': {
             'level': 'INFO',
-            'class': 'logging.handlers.RotatingFileHandler',
+            'class': 'library_service.apps.core.log_handlers.QueuedRotatingFileHandler',
             'filename': os.path.join(BASE_DIR, 'logs', 'application.log'),
             'maxBytes': 1024 * 1024 * 10,  # 10 MB
             'backupCount': 5,
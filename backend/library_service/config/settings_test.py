@@ -0,0 +1,19 @@
+"""
+Django settings for fast local test runs.
+
+Uses an in-memory SQLite database and a cheap password hasher. Tests that
+rely on PostgreSQL features (row locks, driver diagnostics, writable CTEs)
+are skipped here, so CI should still run the suite with the default settings.
+"""
+from .settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
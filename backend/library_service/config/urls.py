@@ -2,18 +2,23 @@
 URL Configuration for Library Service project.
 """
 from django.contrib import admin
+from django.http import HttpResponse
 from django.urls import path, include
+from django.views.decorators.http import require_safe
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
-from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
 from library_service.apps.core.auth_views import SignupView, LoginView, LogoutView, CurrentUserView
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
+HEALTHY = b'{"status": "healthy"}'
+
+@require_safe
 def health_check(request):
-    """Simple health check endpoint for container orchestration."""
-    return Response({'status': 'healthy'})
+    """
+    Simple health check endpoint for container orchestration.
+
+    A plain Django view: probes skip DRF's authentication, content
+    negotiation and throttling.
+    """
+    return HttpResponse(HEALTHY, content_type='application/json')
 
 urlpatterns = [
     # Health check